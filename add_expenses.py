@@ -234,11 +234,6 @@ def display_add_expense_screen(root, auth_manager, dashboard_instance):
             category = category_var.get()
             date = date_var.get()
             
-            user_data = auth_manager.get_current_user_data()
-            
-            if 'expenses' not in user_data:
-                user_data['expenses'] = []
-            
             expense_entry = {
                 'amount': amount,
                 'category': category,
@@ -247,20 +242,11 @@ def display_add_expense_screen(root, auth_manager, dashboard_instance):
                 'timestamp': f"{date} {datetime.now().strftime('%H:%M:%S')}"
             }
             
-            user_data['expenses'].append(expense_entry)
-            
-            if account == "CASH":
-                user_data['cash_balance'] -= amount
-            elif account == "BANK":
-                user_data['bank_balance'] -= amount
-            elif account == "CREDIT CARD":
-                user_data['credit_card_balance'] -= amount
-
-            auth_manager.save_users()
+            # Appends one journal record, the dashboard cards update themselves from the change event
+            auth_manager.add_expense(expense_entry)
             
             messagebox.showinfo("Success", f"Expense of {currency_code} {amount} added successfully!")
             modal.destroy()
-            dashboard_instance.display_dashboard()
 
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter a valid amount.")
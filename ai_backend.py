@@ -0,0 +1,79 @@
+import os
+import time
+import config
+
+
+class GeminiBackend:
+    """Google Gemini, streaming replies from the model named by config.GEMINI_MODEL.
+
+    The system instruction is part of the model object, so one model is kept
+    and only rebuilt when the context it was made for changes.
+    """
+
+    def __init__(self, model_name=None):
+        # Only needed for this backend, so the local one runs without either package installed
+        from dotenv import load_dotenv
+        import google.generativeai as genai
+
+        load_dotenv()
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.genai = genai
+        self.name = model_name or config.GEMINI_MODEL
+        self.model = (None, None)
+
+    def stream(self, context, contents, timeout):
+        """Yield the reply's text as it arrives, contents being the chat turns ending with the question."""
+        model_context, model = self.model
+        if model is None or model_context != context:
+            model = self.genai.GenerativeModel(self.name, system_instruction=context)
+            # One assignment, so a second worker thread sees either the old pair or the new one
+            self.model = (context, model)
+        response = model.generate_content(contents, stream=True, request_options={"timeout": timeout})
+        for chunk in response:
+            yield chunk.text
+
+
+class LocalBackend:
+    """Offline stand-in that answers every question with the same canned markdown.
+
+    It waits `latency` seconds before the first chunk and `chunk_delay`
+    between chunks of `chunk_size` characters, so the chat can be exercised
+    and timed without a network. The size of every prompt it was sent is kept
+    in prompt_sizes.
+    """
+
+    name = "local"
+
+    def __init__(self, latency=None, chunk_size=None, chunk_delay=None):
+        self.latency = config.LOCAL_AI_LATENCY if latency is None else latency
+        self.chunk_size = chunk_size or config.LOCAL_AI_CHUNK_SIZE
+        self.chunk_delay = config.LOCAL_AI_CHUNK_DELAY if chunk_delay is None else chunk_delay
+        self.prompt_sizes = []
+
+    def stream(self, context, contents, timeout):
+        question = contents[-1]["parts"][0]
+        self.prompt_sizes.append(len(context) + sum(len(turn["parts"][0]) for turn in contents))
+        text = self.reply(context, contents, question)
+
+        time.sleep(self.latency)
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                time.sleep(self.chunk_delay)
+            yield text[start:start + self.chunk_size]
+
+    def reply(self, context, contents, question):
+        return (f"## Local reply\n\n"
+                f"You asked: **{question}**\n\n"
+                f"- Context: {len(context):,} characters\n"
+                f"- Earlier turns: {len(contents) - 1}\n\n"
+                f"This answer comes from the offline stand-in, no AI service was contacted.")
+
+
+def create_backend(backend=None):
+    """Build the AI backend selected by config.AI_BACKEND."""
+    backend = backend or config.AI_BACKEND
+    if backend == "gemini":
+        return GeminiBackend()
+    if backend == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown AI backend: {backend}")
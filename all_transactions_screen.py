@@ -1,12 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from datetime import datetime
 import config
 import csv
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+from transaction_sort import TransactionSorter
+
+LOAD_BATCH_SIZE = 500
 
 class AllTransactionsScreen:
     def __init__(self, master, auth_manager, app_instance):
@@ -19,6 +17,13 @@ class AllTransactionsScreen:
         self.window.transient(self.master)
         self.window.grab_set()
 
+        self.expenses = []
+        self.rows = []
+        self.sorter = TransactionSorter()
+        self.loaded_count = 0
+        self.load_job = None
+        self.window.bind("<Destroy>", self._on_destroy)
+
         self._create_widgets()
         self._load_transactions()
 
@@ -34,6 +39,9 @@ class AllTransactionsScreen:
         )
         export_button.pack(side=tk.RIGHT, padx=(10, 0))
 
+        self.progress_label = ttk.Label(control_frame, text="")
+        self.progress_bar = ttk.Progressbar(control_frame, mode="determinate", length=200)
+
         s = ttk.Style()
         s.configure("Export.TButton",
             background="#2ECC71", # Green background
@@ -71,39 +79,81 @@ class AllTransactionsScreen:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
     def _load_transactions(self):
-        for item in self.transactions_tree.get_children():
-            self.transactions_tree.delete(item)
+        self._cancel_loading()
+        self.transactions_tree.delete(*self.transactions_tree.get_children())
 
         user_data = self.auth_manager.get_current_user_data()
-        all_expenses = user_data.get('expenses', [])
         currency_code = user_data.get('currency', 'INR')
-        currency_symbol = config.CURRENCY_SYMBOLS.get(currency_code, '₹')
+        self.currency_symbol = config.CURRENCY_SYMBOLS.get(currency_code, '₹')
 
-        all_expenses.sort(key=lambda x: datetime.fromisoformat(x['date']), reverse=True)
+        # Newest first, ordered by the storage backend
+        self.expenses = self.auth_manager.get_expenses_between()
+        self.sorter.set_rows(self.expenses)
 
-        if not all_expenses:
+        if not self.expenses:
             self.transactions_tree.insert("", "end", values=("", "No transactions yet", ""))
+            return
+
+        self._show_rows(self.expenses)
+
+    def _show_rows(self, rows):
+        """Replace the table contents with rows, restarting the batched insert if one is running."""
+        self._cancel_loading()
+        self.transactions_tree.delete(*self.transactions_tree.get_children())
+        self.rows = rows
+        self.loaded_count = 0
+
+        # The first batch goes in now so the table is never empty, the rest follows between UI events
+        self.progress_bar.configure(maximum=len(rows), value=0)
+        self._insert_batch()
+
+    def _insert_batch(self, batch_size=LOAD_BATCH_SIZE):
+        self.load_job = None
+        end = min(self.loaded_count + batch_size, len(self.rows))
+        for expense in self.rows[self.loaded_count:end]:
+            self.transactions_tree.insert("", "end", values=self._row_values(expense))
+        self.loaded_count = end
+
+        if self.loaded_count < len(self.rows):
+            self._show_progress()
+            self.load_job = self.window.after(1, self._insert_batch)
         else:
-            for expense in all_expenses:
-                display_date = datetime.fromisoformat(expense['date']).strftime("%Y-%m-%d")
-                category = expense['category'].capitalize()
-                amount = expense['amount']
-                amount_text = f"-{currency_symbol}{amount:,.2f}"
-                self.transactions_tree.insert("", "end", values=(display_date, category, amount_text))
+            self._hide_progress()
+
+    def _row_values(self, expense):
+        return (
+            expense.date.strftime("%Y-%m-%d"),
+            expense.category.capitalize(),
+            f"-{self.currency_symbol}{expense.amount:,.2f}"
+        )
+
+    def _cancel_loading(self):
+        if self.load_job is not None:
+            self.window.after_cancel(self.load_job)
+            self.load_job = None
+        self._hide_progress()
+
+    def _show_progress(self):
+        self.progress_bar.configure(value=self.loaded_count)
+        self.progress_label.configure(text=f"Loading {self.loaded_count:,} of {len(self.rows):,}")
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_label.pack(side=tk.LEFT)
+            self.progress_bar.pack(side=tk.LEFT, padx=(10, 0))
+
+    def _hide_progress(self):
+        self.progress_label.pack_forget()
+        self.progress_bar.pack_forget()
+
+    def _on_destroy(self, event):
+        if event.widget is self.window and self.load_job is not None:
+            self.window.after_cancel(self.load_job)
+            self.load_job = None
 
     def _sort_column(self, col, reverse):
-        l = [(self.transactions_tree.set(k, col), k) for k in self.transactions_tree.get_children('')]
-        
-        if col == "Date":
-            l.sort(key=lambda t: datetime.strptime(t[0], "%Y-%m-%d"), reverse=reverse)
-        elif col == "Amount":
-            l.sort(key=lambda t: float(t[0].replace(config.CURRENCY_SYMBOLS.get(self.auth_manager.get_current_user_data().get('currency', 'INR'), '₹'), '').replace(',', '')), reverse=reverse)
-        else:
-            l.sort(reverse=reverse)
+        # Works mid-load too: the sorted rows simply restart the batched insert
+        if self.expenses:
+            self._show_rows(self.sorter.sorted_rows(col, reverse))
 
-        for index, (val, k) in enumerate(l):
-            self.transactions_tree.move(k, '', index)
-        
         self.transactions_tree.heading(col, command=lambda: self._sort_column(col, not reverse))
 
     def _export_to_csv(self):
@@ -142,6 +192,12 @@ class AllTransactionsScreen:
             if not file_path:
                 return
 
+            # reportlab is only needed here, so it loads on the first export instead of with the screen
+            from reportlab.lib.pagesizes import letter
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+            from reportlab.lib import colors
+            from reportlab.lib.styles import getSampleStyleSheet
+
             user_data = self.auth_manager.get_current_user_data()
             all_expenses = user_data.get('expenses', [])
             currency_code = user_data.get('currency', 'INR')
@@ -192,11 +248,11 @@ class AllTransactionsScreen:
 
             data = [["Date", "Category", "Amount", "Account", "Timestamp"]]
             for expense in all_expenses:
-                display_date = datetime.fromisoformat(expense['date']).strftime("%Y-%m-%d")
-                category = expense['category'].capitalize()
-                amount = f"{pdf_currency} {expense['amount']:.2f}"
-                account = expense.get('account', 'N/A')
-                timestamp = expense.get('timestamp', 'N/A')
+                display_date = expense.date.strftime("%Y-%m-%d")
+                category = expense.category.capitalize()
+                amount = f"{pdf_currency} {expense.amount:.2f}"
+                account = expense.account
+                timestamp = expense.timestamp.strftime("%Y-%m-%d %H:%M:%S")
                 data.append([display_date, category, amount, account, timestamp])
 
             table_style = TableStyle([
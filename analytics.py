@@ -0,0 +1,86 @@
+from datetime import date
+import numpy as np
+from expense_store import MINOR_UNITS
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class ExpenseFrame:
+    """A user's expenses as NumPy columns for vectorized summaries.
+
+    dates are datetime64[D], amounts int64 minor units, category/account
+    integer codes into `categories`/`accounts`, timestamps int64 seconds in
+    the ExpenseStore encoding. Totals come back as floats in major units.
+    """
+
+    def __init__(self, store):
+        # np.array copies, so the store's arrays stay free to grow
+        self.dates = (np.array(store.ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+        self.amounts = np.array(store.amounts, dtype=np.int64)
+        self.category_codes = np.array(store.category_codes, dtype=np.intp)
+        self.account_codes = np.array(store.account_codes, dtype=np.intp)
+        self.timestamps = np.array(store.timestamps, dtype=np.int64)
+        self.categories = list(store.categories)
+        self.accounts = list(store.accounts)
+        self.row_count = len(store)
+
+    def __len__(self):
+        return self.row_count
+
+    def mask_between(self, start_date=None, end_date=None):
+        """Boolean mask of rows dated within [start_date, end_date] (date objects, None = open)."""
+        mask = np.ones(self.row_count, dtype=bool)
+        if start_date is not None:
+            mask &= self.dates >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= self.dates <= np.datetime64(end_date, 'D')
+        return mask
+
+    def total(self, mask=None):
+        amounts = self.amounts if mask is None else self.amounts[mask]
+        return int(amounts.sum()) / MINOR_UNITS
+
+    def count(self, mask=None):
+        return self.row_count if mask is None else int(np.count_nonzero(mask))
+
+    def sum_by_category(self, mask=None):
+        """[(category, total)] largest first."""
+        return self._sum_by(self.category_codes, self.categories, mask)
+
+    def sum_by_account(self, mask=None):
+        """[(account, total)] largest first."""
+        return self._sum_by(self.account_codes, self.accounts, mask)
+
+    def recent_rows(self, limit):
+        """Row numbers of the `limit` latest timestamps, newest first."""
+        if limit >= self.row_count:
+            rows = np.argsort(self.timestamps, kind='stable')
+        else:
+            rows = np.argpartition(self.timestamps, self.row_count - limit)[self.row_count - limit:]
+            rows = rows[np.argsort(self.timestamps[rows], kind='stable')]
+        return [int(row) for row in rows[::-1][:limit]]
+
+    def _sum_by(self, codes, names, mask):
+        amounts = self.amounts
+        if mask is not None:
+            codes, amounts = codes[mask], amounts[mask]
+        # Minor units stay exact as float64 well past any realistic total
+        totals = np.bincount(codes, weights=amounts, minlength=len(names))
+        present = np.flatnonzero(np.bincount(codes, minlength=len(names)))
+        return sorted(
+            ((names[code], float(totals[code]) / MINOR_UNITS) for code in present),
+            key=lambda item: item[1], reverse=True
+        )
+
+
+_cached_frame = (None, None)
+
+
+def frame_for(store):
+    """ExpenseFrame for store, reused until rows are appended to it (rows never change once added)."""
+    global _cached_frame
+    cached_store, frame = _cached_frame
+    if cached_store is not store or len(frame) != len(store):
+        frame = ExpenseFrame(store)
+        _cached_frame = (store, frame)
+    return frame
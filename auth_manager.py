@@ -1,35 +1,107 @@
-import json
-import os
 import hashlib
 import re
 from datetime import datetime
-import config
+import storage
+from expense_store import ExpenseStore
+from expense_summary import ExpenseSummary
 
 class AuthManager:
     def __init__(self):
-        self.users_file = config.USERS_FILE
+        self.storage = storage.create_storage()
+        # Credentials index (name and password hash per email), all login needs
         self.users = {}
+        # Full data per email, only loaded once that user has logged in
+        self.user_data = {}
+        # Emails whose in-memory data has changes not yet written to storage
+        self.dirty = set()
         self.current_user = None
+        # Callbacks run after the current user's data changes, e.g. dashboard cards
+        self.listeners = []
         self.load_users()
 
     def load_users(self):
-        if os.path.exists(self.users_file):
-            with open(self.users_file, 'r') as f:
-                self.users = json.load(f)
-            for user_email in self.users:
-                if "bank_balance" not in self.users[user_email]:
-                    self.users[user_email]["bank_balance"] = 0.0
-                if "credit_card_balance" not in self.users[user_email]:
-                    self.users[user_email]["credit_card_balance"] = 0.0
-                if "cash_balance" not in self.users[user_email]:
-                    self.users[user_email]["cash_balance"] = 0.0
-            self.save_users()
-        else:
-            self.users = {}
+        self.users = self.storage.load_index()
+
+    def refresh_if_changed(self):
+        """Re-read from disk only if another process changed the data since we last read or wrote it."""
+        if self.storage.index_changed():
+            self.users = self.storage.load_index()
+        if self.current_user in self.user_data and self.storage.user_changed(self.current_user):
+            self._load_user_data(self.current_user)
+            self._notify_data_changed()
+
+    def add_listener(self, callback):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _notify_data_changed(self):
+        for callback in list(self.listeners):
+            callback()
+
+    def _load_user_data(self, email):
+        user_data = self.storage.load_user(email)
+        if user_data.get("schema_version", 0) < storage.USER_SCHEMA_VERSION:
+            self._migrate_user_data(user_data)
+            self.dirty.add(email)
+        self.user_data[email] = user_data
+        self.save_users()
+        return user_data
+
+    def _migrate_user_data(self, user_data):
+        # Accounts created before balances were tracked
+        for field in ("bank_balance", "credit_card_balance", "cash_balance"):
+            user_data.setdefault(field, 0.0)
+        user_data["schema_version"] = storage.USER_SCHEMA_VERSION
 
     def save_users(self):
-        with open(self.users_file, 'w') as f:
-            json.dump(self.users, f, indent=4)
+        """Write a full snapshot of every loaded user whose data changed outside the journal."""
+        for email in list(self.dirty):
+            if email in self.user_data:
+                self.storage.save_user(email, self.user_data[email])
+            self.dirty.discard(email)
+
+    def _record(self, entry):
+        self.storage.record(self.current_user, self.get_current_user_data(), entry)
+
+    def add_expense(self, expense):
+        """Add an expense for the current user, charging it to its account balance."""
+        expense = storage.apply_expense(self.get_current_user_data(), expense)
+        self._record({"op": "expense", "expense": expense.to_dict()})
+        self._notify_data_changed()
+
+    def get_expenses_between(self, start_date=None, end_date=None):
+        """Current user's expenses dated within [start_date, end_date], newest first."""
+        return self.storage.expenses_between(
+            self.current_user, self.get_current_user_data(), self._iso(start_date), self._iso(end_date))
+
+    def get_expense_range(self, start_date=None, end_date=None):
+        """Lazy newest-first view of the current user's expenses dated within the range."""
+        return storage.loaded_expense_range(self.get_current_user_data(), self._iso(start_date), self._iso(end_date))
+
+    def search_expenses(self, query, limit=None):
+        """Current user's expenses whose words start with every word of query, newest first."""
+        return storage.loaded_search_expenses(self.get_current_user_data(), query, limit)
+
+    def get_total_between(self, start_date=None, end_date=None):
+        """Total of the current user's expenses dated within [start_date, end_date]."""
+        return self.storage.total_between(
+            self.current_user, self.get_current_user_data(), self._iso(start_date), self._iso(end_date))
+
+    def sum_by_category(self, start_date=None, end_date=None):
+        """[(category, total)] of the current user's expenses dated within the range, largest first."""
+        return self.storage.sum_by_category(
+            self.current_user, self.get_current_user_data(), self._iso(start_date), self._iso(end_date))
+
+    def get_expense_summary(self):
+        """Dashboard windows, daily series, category breakdown and recent expenses in one pass."""
+        return ExpenseSummary(storage.expense_store(self.get_current_user_data()))
+
+    def _iso(self, value):
+        return value.isoformat() if hasattr(value, "isoformat") else value
 
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
@@ -47,6 +119,11 @@ class AuthManager:
             return False, "Password must contain at least one digit"
         return True, "Valid"
 
+    def preload_user(self, email):
+        """Let storage start reading a known user's data while they are still typing their password."""
+        if email in self.users and email not in self.user_data:
+            self.storage.preload_user(email)
+
     def login(self, email, password):
         if not email or not password:
             return False, "Please fill in all fields", None
@@ -59,6 +136,8 @@ class AuthManager:
             return False, "Incorrect password", None
         
         self.current_user = email
+        # Expense history is read only now, not when the login screen opens
+        self._load_user_data(email)
         return True, f"Welcome back, {self.users[email]['name']}!", self.users[email]['name']
 
     def signup(self, name, email, password, confirm_password, terms_agreed):
@@ -81,19 +160,20 @@ class AuthManager:
         if not valid:
             return False, message
         
-        self.users[email] = {
+        user_data = {
             "name": name,
-            "password": self.hash_password(password),
             "created_at": datetime.now().isoformat(),
             "monthly_budget": None,
             "currency": None,
             "cash_balance": 0.0,
             "bank_balance": 0.0,
             "credit_card_balance": 0.0,
-            "expenses": []
+            "schema_version": storage.USER_SCHEMA_VERSION,
+            "expenses": ExpenseStore()
         }
         
-        self.save_users()
+        self.users[email] = self.storage.create_user(email, self.hash_password(password), user_data)
+        self.user_data[email] = user_data
         self.current_user = email
         
         return True, f"Welcome {name}! Let's set up your account."
@@ -113,30 +193,47 @@ class AuthManager:
         
         currency_code = currency_full.split(" - ")[0]
         
-        existing_budget = self.users[self.current_user].get("monthly_budget", 0.0) or 0.0
+        user_data = self.get_current_user_data()
+        
+        existing_budget = user_data.get("monthly_budget", 0.0) or 0.0
         
         new_total_budget = existing_budget + budget_value
         
-        self.users[self.current_user]["monthly_budget"] = new_total_budget
-        self.users[self.current_user]["currency"] = currency_code
+        user_data["monthly_budget"] = new_total_budget
+        user_data["currency"] = currency_code
         
-        if "cash_balance" not in self.users[self.current_user]:
-            self.users[self.current_user]["cash_balance"] = 0.0
-        if "bank_balance" not in self.users[self.current_user]:
-            self.users[self.current_user]["bank_balance"] = 0.0
-        if "credit_card_balance" not in self.users[self.current_user]:
-            self.users[self.current_user]["credit_card_balance"] = 0.0
-        self.save_users()
+        if "cash_balance" not in user_data:
+            user_data["cash_balance"] = 0.0
+        if "bank_balance" not in user_data:
+            user_data["bank_balance"] = 0.0
+        if "credit_card_balance" not in user_data:
+            user_data["credit_card_balance"] = 0.0
+        self._record({
+            "op": "budget",
+            "monthly_budget": new_total_budget,
+            "currency": currency_code
+        })
+        self._notify_data_changed()
         
-        user_name = self.users[self.current_user]["name"]
+        user_name = user_data["name"]
         
         if existing_budget == 0:
             return True, f"Great job, {user_name}! 🎉\n\nYour account is all set up.\nRedirecting to dashboard."
         else:
             return True, f"Budget updated successfully! 🎉\n\nAdded {budget_value:.2f} to your budget.\nNew total budget: {new_total_budget:.2f}"
 
+    def take_write_error(self):
+        """The last background save that failed since the previous call, or None."""
+        return self.storage.take_write_error()
+
+    def close(self):
+        """Write everything still pending, called once when the app exits."""
+        self.save_users()
+        self.storage.close()
+
     def get_current_user_data(self):
-        return self.users.get(self.current_user)
+        return self.user_data.get(self.current_user)
 
     def logout(self):
+        self.user_data.pop(self.current_user, None)
         self.current_user = None
@@ -8,7 +8,34 @@ WHITE = "#ffffff"
 SUCCESS = "#2ECC71"   
 ERROR = "#E74C3C"      
 
+# "json" keeps users.json plus a journal, "sqlite" migrates it into DATABASE_FILE
+STORAGE_BACKEND = "json"
+DATABASE_FILE = "expenses.db"
+# Credentials index, each user's expenses live in a separate file under USER_DATA_DIR
 USERS_FILE = "users.json"
+USER_DATA_DIR = "user_data"
+# Single-file journal from before per-user data files, only read when migrating
+JOURNAL_FILE = "users.journal"
+# Fold a user's journal back into their data file after this many appended records
+JOURNAL_COMPACT_THRESHOLD = 500
+# Seconds a burst of saves is allowed to settle before the write-behind thread writes it
+WRITE_BEHIND_DELAY = 0.5
+# How often the UI checks for background saves that failed, in milliseconds
+WRITE_ERROR_CHECK_MS = 2000
+# AI answers are reused while the question and the user's data are unchanged
+AI_CACHE_FILE = "ai_cache.json"
+AI_CACHE_MAX_ENTRIES = 200
+AI_CACHE_MAX_AGE = 7 * 24 * 3600
+# Rough token caps on what goes with each AI question: the expense summary and the earlier chat turns
+AI_CONTEXT_TOKEN_BUDGET = 1000
+AI_HISTORY_TOKEN_BUDGET = 2000
+# "gemini" talks to Google's API, "local" is an offline stand-in with canned, timed replies
+AI_BACKEND = "gemini"
+GEMINI_MODEL = "gemini-2.5-flash"
+# Seconds before the local stand-in's first chunk and between chunks, and characters per chunk
+LOCAL_AI_LATENCY = 0.5
+LOCAL_AI_CHUNK_DELAY = 0.05
+LOCAL_AI_CHUNK_SIZE = 40
 
 # Font preferences
 FONT_PRIMARY = "Segoe UI"
@@ -0,0 +1,478 @@
+import json
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+
+MINOR_UNITS = 100
+SECONDS_PER_DAY = 86400
+
+STORE_MAGIC = b"EXPS"
+STORE_VERSION = 2
+STORE_HEADER = struct.Struct("<4sHII")  # magic, version, row count, names block length
+AGGREGATE_HEADER = struct.Struct("<I")  # cell count, version 2 onwards
+
+# (attribute, array typecode) in the order the aggregate cells are written to disk
+AGGREGATE_COLUMNS = (("ordinals", "i"), ("category_codes", "H"), ("account_codes", "H"), ("amounts", "q"))
+
+# (attribute, array typecode) in the order the columns are written to disk
+COLUMNS = (
+    ("ordinals", "i"),         # date as date.toordinal()
+    ("amounts", "q"),          # amount in minor units (cents)
+    ("category_codes", "H"),   # index into ExpenseStore.categories
+    ("account_codes", "H"),    # index into ExpenseStore.accounts
+    ("timestamps", "q"),       # seconds since 0001-01-01 00:00:00
+)
+
+
+def to_minor_units(amount):
+    return int(round(float(amount) * MINOR_UNITS))
+
+
+def parse_timestamp(value):
+    return timestamp_seconds(datetime.fromisoformat(value))
+
+
+def timestamp_seconds(moment):
+    """A datetime in the store's timestamp encoding, whole seconds since 0001-01-01."""
+    return moment.toordinal() * SECONDS_PER_DAY + moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+def search_terms(text):
+    """Lowercased words of text for SearchIndex, ignoring currency symbols and thousands separators."""
+    terms = (term.strip(".-") for term in re.findall(r"[\w.\-]+", text.lower().replace(",", "")))
+    return [term for term in terms if term]
+
+
+def format_timestamp(seconds):
+    ordinal, seconds_of_day = divmod(seconds, SECONDS_PER_DAY)
+    hours, remainder = divmod(seconds_of_day, 3600)
+    return f"{date.fromordinal(ordinal).isoformat()} {hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}"
+
+
+class Expense:
+    """One row of an ExpenseStore.
+
+    expense.date and expense.timestamp are a date and a datetime built from
+    the stored integers, never re-parsed from text. expense['date'] and
+    expense.get(...) still return the ISO strings the old dict records held,
+    for exports and other code that wants the stored form.
+    """
+
+    __slots__ = ("ordinal", "amount_minor", "category", "account", "timestamp_seconds")
+
+    def __init__(self, ordinal, amount_minor, category, account, timestamp_seconds):
+        self.ordinal = ordinal
+        self.amount_minor = amount_minor
+        self.category = category
+        self.account = account
+        self.timestamp_seconds = timestamp_seconds
+
+    @classmethod
+    def from_dict(cls, expense):
+        return cls(
+            date.fromisoformat(expense["date"]).toordinal(),
+            to_minor_units(expense["amount"]),
+            expense["category"],
+            # Older records have no account, the screens show those as Cash
+            expense.get("account") or "Cash",
+            parse_timestamp(expense.get("timestamp") or expense["date"])
+        )
+
+    @property
+    def amount(self):
+        return self.amount_minor / MINOR_UNITS
+
+    @property
+    def date(self):
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def timestamp(self):
+        day, seconds_of_day = divmod(self.timestamp_seconds, SECONDS_PER_DAY)
+        return datetime.fromordinal(day) + timedelta(seconds=seconds_of_day)
+
+    def __getitem__(self, key):
+        if key == "amount":
+            return self.amount
+        if key == "category":
+            return self.category
+        if key == "account":
+            return self.account
+        if key == "date":
+            return date.fromordinal(self.ordinal).isoformat()
+        if key == "timestamp":
+            return format_timestamp(self.timestamp_seconds)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {key: self[key] for key in ("amount", "category", "account", "date", "timestamp")}
+
+    def __repr__(self):
+        return f"Expense({self.to_dict()!r})"
+
+
+class DailyAggregates:
+    """Spending totals per (day, category, account), kept up to date as expenses are added.
+
+    Cells are grouped by date ordinal, so a window of N days touches at most
+    N groups of a few cells each however many expenses the user has.
+    Amounts are in minor units, category and account are the store's codes.
+    """
+
+    def __init__(self):
+        self.days = {}
+
+    def add(self, ordinal, category_code, account_code, amount):
+        cells = self.days.get(ordinal)
+        if cells is None:
+            cells = self.days[ordinal] = {}
+        key = (category_code, account_code)
+        cells[key] = cells.get(key, 0) + amount
+
+    def cells_between(self, start_ordinal, end_ordinal):
+        """Yield (ordinal, category_code, account_code, amount) for days in [start_ordinal, end_ordinal]."""
+        if end_ordinal - start_ordinal + 1 > len(self.days):
+            # Sparse history, walking the days we have is cheaper than walking the window
+            ordinals = sorted(ordinal for ordinal in self.days if start_ordinal <= ordinal <= end_ordinal)
+        else:
+            ordinals = [ordinal for ordinal in range(start_ordinal, end_ordinal + 1) if ordinal in self.days]
+        for ordinal in ordinals:
+            for (category_code, account_code), amount in self.days[ordinal].items():
+                yield ordinal, category_code, account_code, amount
+
+    def copy(self):
+        aggregates = DailyAggregates()
+        aggregates.days = {ordinal: dict(cells) for ordinal, cells in self.days.items()}
+        return aggregates
+
+    def to_columns(self):
+        columns = {name: array(typecode) for name, typecode in AGGREGATE_COLUMNS}
+        for ordinal, cells in self.days.items():
+            for (category_code, account_code), amount in cells.items():
+                columns["ordinals"].append(ordinal)
+                columns["category_codes"].append(category_code)
+                columns["account_codes"].append(account_code)
+                columns["amounts"].append(amount)
+        return [columns[name] for name, _ in AGGREGATE_COLUMNS]
+
+    @classmethod
+    def from_columns(cls, ordinals, category_codes, account_codes, amounts):
+        aggregates = cls()
+        for cell in zip(ordinals, category_codes, account_codes, amounts):
+            aggregates.add(*cell)
+        return aggregates
+
+
+class DateIndex:
+    """Rows of an ExpenseStore sorted by date, with running totals of their amounts.
+
+    A date range maps to a contiguous slice found with two binary searches,
+    and its total is the difference of two running totals.
+    """
+
+    def __init__(self, store):
+        ordinals, timestamps = store.ordinals, store.timestamps
+        rows = sorted(range(len(store)), key=lambda row: (ordinals[row], timestamps[row]))
+        self.rows = array('i', rows)
+        self.ordinals = array('i', (ordinals[row] for row in rows))
+        self.cumulative = array('q', [0])
+        running = 0
+        for row in rows:
+            running += store.amounts[row]
+            self.cumulative.append(running)
+        self.last_key = (ordinals[rows[-1]], timestamps[rows[-1]]) if rows else None
+
+    def try_append(self, row, ordinal, timestamp, amount):
+        """Extend the index with a newly appended row, False if it would not sort last."""
+        if self.last_key is not None and (ordinal, timestamp) < self.last_key:
+            return False
+        self.rows.append(row)
+        self.ordinals.append(ordinal)
+        self.cumulative.append(self.cumulative[-1] + amount)
+        self.last_key = (ordinal, timestamp)
+        return True
+
+    def bounds(self, start_ordinal=None, end_ordinal=None):
+        low = 0 if start_ordinal is None else bisect_left(self.ordinals, start_ordinal)
+        high = len(self.ordinals) if end_ordinal is None else bisect_right(self.ordinals, end_ordinal)
+        return low, max(low, high)
+
+    def total_between(self, start_ordinal=None, end_ordinal=None):
+        """Sum of amounts (minor units) dated within [start_ordinal, end_ordinal]."""
+        low, high = self.bounds(start_ordinal, end_ordinal)
+        return self.cumulative[high] - self.cumulative[low]
+
+    def rows_between(self, start_ordinal=None, end_ordinal=None):
+        """Row numbers dated within the range, oldest first."""
+        low, high = self.bounds(start_ordinal, end_ordinal)
+        return self.rows[low:high]
+
+
+class SearchIndex:
+    """Inverted index from words to the rows they appear in, for transaction search.
+
+    A row is found by the words of its category and account, its ISO date,
+    month name and day of month, and its amount as "1234.50". Every query
+    word must match the start of some word of the row. Postings are row
+    numbers in insertion order and the vocabulary is kept sorted, so a
+    prefix is one binary search and the work after that is proportional
+    to the matching rows.
+    """
+
+    def __init__(self, store):
+        self.postings = {}
+        self.vocabulary = []
+        self._name_terms = {}
+        self._date_terms = {}
+        for row in range(len(store)):
+            self.add(row, store.categories[store.category_codes[row]], store.accounts[store.account_codes[row]],
+                     store.ordinals[row], store.amounts[row])
+
+    def add(self, row, category, account, ordinal, amount):
+        terms = set(self._terms_for_name(category))
+        terms.update(self._terms_for_name(account))
+        terms.update(self._terms_for_date(ordinal))
+        terms.add(f"{amount // MINOR_UNITS}.{amount % MINOR_UNITS:02d}")
+        for term in terms:
+            rows = self.postings.get(term)
+            if rows is None:
+                rows = self.postings[term] = array('i')
+                insort(self.vocabulary, term)
+            rows.append(row)
+
+    def search(self, query):
+        """Set of rows matching every word of query, None for a query with no words."""
+        terms = search_terms(query)
+        if not terms:
+            return None
+        matches = sorted((self._prefix_rows(term) for term in set(terms)), key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            rows = rows.intersection(other)
+        return rows
+
+    def _prefix_rows(self, prefix):
+        rows = set()
+        position = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            rows.update(self.postings[self.vocabulary[position]])
+            position += 1
+        return rows
+
+    def _terms_for_name(self, name):
+        terms = self._name_terms.get(name)
+        if terms is None:
+            terms = self._name_terms[name] = search_terms(name)
+        return terms
+
+    def _terms_for_date(self, ordinal):
+        terms = self._date_terms.get(ordinal)
+        if terms is None:
+            day = date.fromordinal(ordinal)
+            terms = self._date_terms[ordinal] = [day.isoformat(), day.strftime("%B").lower(), f"{day.day:02d}"]
+        return terms
+
+
+class ExpenseRange:
+    """Read-only view of the expenses in a date range, newest first.
+
+    Only holds two positions into a DateIndex, so a year of history costs
+    nothing until rows are actually read.
+    """
+
+    def __init__(self, store, index, low, high):
+        self.store = store
+        self.index = index
+        self.low = low
+        self.high = high
+
+    def __len__(self):
+        return self.high - self.low
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self.store[self.index.rows[self.high - 1 - position]]
+
+    def months(self):
+        """[(first day of month, position of its newest expense, expense count)], newest month first."""
+        months = []
+        high = self.high
+        while high > self.low:
+            month_start = date.fromordinal(self.index.ordinals[high - 1]).replace(day=1)
+            boundary = bisect_left(self.index.ordinals, month_start.toordinal(), self.low, high)
+            months.append((month_start, self.high - high, high - boundary))
+            high = boundary
+        return months
+
+
+class ExpenseStore:
+    """A user's expenses kept as typed columns instead of one dict per row.
+
+    Dates are ordinals, amounts are integer minor units and category/account
+    names are interned to small codes, which takes a row from several hundred
+    bytes of dicts and strings down to 24 bytes. to_bytes()/from_bytes() use
+    the same layout on disk, so loading is one read plus a copy per column.
+    The DailyAggregates kept alongside are written to disk with the columns.
+    """
+
+    def __init__(self):
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.aggregates = DailyAggregates()
+        self._date_index = None
+        self._search_index = None
+        self.categories = []
+        self.accounts = []
+        self._category_codes = {}
+        self._account_codes = {}
+
+    @classmethod
+    def from_dicts(cls, expenses):
+        store = cls()
+        for expense in expenses:
+            store.append(expense)
+        return store
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return Expense(
+            self.ordinals[index],
+            self.amounts[index],
+            self.categories[self.category_codes[index]],
+            self.accounts[self.account_codes[index]],
+            self.timestamps[index]
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, expense):
+        """Add an Expense or a dict with the amount/category/account/date/timestamp keys."""
+        if not isinstance(expense, Expense):
+            expense = Expense.from_dict(expense)
+        category_code = self._intern(expense.category, self.categories, self._category_codes)
+        account_code = self._intern(expense.account, self.accounts, self._account_codes)
+        self.ordinals.append(expense.ordinal)
+        self.amounts.append(expense.amount_minor)
+        self.category_codes.append(category_code)
+        self.account_codes.append(account_code)
+        self.timestamps.append(expense.timestamp_seconds)
+        self.aggregates.add(expense.ordinal, category_code, account_code, expense.amount_minor)
+        if self._date_index is not None and not self._date_index.try_append(
+                len(self) - 1, expense.ordinal, expense.timestamp_seconds, expense.amount_minor):
+            # Back-dated expense, re-sort on the next range query
+            self._date_index = None
+        if self._search_index is not None:
+            self._search_index.add(len(self) - 1, expense.category, expense.account,
+                                   expense.ordinal, expense.amount_minor)
+
+    def date_index(self):
+        """The DateIndex for these rows, built on first use and kept current by append()."""
+        if self._date_index is None:
+            self._date_index = DateIndex(self)
+        return self._date_index
+
+    def search_index(self):
+        """The SearchIndex for these rows, built on first use and kept current by append()."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    def copy(self):
+        store = ExpenseStore()
+        for name, _ in COLUMNS:
+            column = getattr(self, name)
+            setattr(store, name, array(column.typecode, column))
+        store.aggregates = self.aggregates.copy()
+        store.categories = list(self.categories)
+        store.accounts = list(self.accounts)
+        store._category_codes = dict(self._category_codes)
+        store._account_codes = dict(self._account_codes)
+        return store
+
+    def to_bytes(self):
+        names = json.dumps({"categories": self.categories, "accounts": self.accounts}).encode('utf-8')
+        parts = [STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(self), len(names)), names]
+        parts.extend(_column_bytes(getattr(self, name)) for name, _ in COLUMNS)
+        aggregate_columns = self.aggregates.to_columns()
+        parts.append(AGGREGATE_HEADER.pack(len(aggregate_columns[0])))
+        parts.extend(_column_bytes(column) for column in aggregate_columns)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """Decode a store written by to_bytes(), starting at offset within data."""
+        view = memoryview(data)
+        magic, version, row_count, names_length = STORE_HEADER.unpack_from(view, offset)
+        if magic != STORE_MAGIC or version not in (1, STORE_VERSION):
+            raise ValueError("Not an expense store or unsupported version")
+        offset += STORE_HEADER.size
+
+        store = cls()
+        names = json.loads(bytes(view[offset:offset + names_length]).decode('utf-8'))
+        offset += names_length
+        store.categories = names["categories"]
+        store.accounts = names["accounts"]
+        store._category_codes = {name: code for code, name in enumerate(store.categories)}
+        store._account_codes = {name: code for code, name in enumerate(store.accounts)}
+
+        for name, typecode in COLUMNS:
+            column, offset = _read_column(view, offset, typecode, row_count)
+            setattr(store, name, column)
+
+        if version == 1:
+            # Written before aggregates were stored, rebuild them from the rows
+            store.aggregates = DailyAggregates.from_columns(
+                store.ordinals, store.category_codes, store.account_codes, store.amounts)
+            return store
+        cell_count, = AGGREGATE_HEADER.unpack_from(view, offset)
+        offset += AGGREGATE_HEADER.size
+        aggregate_columns = []
+        for _, typecode in AGGREGATE_COLUMNS:
+            column, offset = _read_column(view, offset, typecode, cell_count)
+            aggregate_columns.append(column)
+        store.aggregates = DailyAggregates.from_columns(*aggregate_columns)
+        return store
+
+    def _intern(self, name, names, codes):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+
+def _column_bytes(column):
+    # Always little-endian on disk
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(view, offset, typecode, count):
+    column = array(typecode)
+    size = count * column.itemsize
+    column.frombytes(view[offset:offset + size])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, offset + size
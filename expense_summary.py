@@ -0,0 +1,54 @@
+from datetime import date
+from expense_store import MINOR_UNITS
+
+
+class ExpenseSummary:
+    """Every figure the dashboard shows, computed in one pass over a user's daily aggregates.
+
+    Windows are calendar days ending today: week_total covers the last 7 days,
+    month_total and the category breakdown the last 30, year_total the last
+    365. daily_totals holds the last `series_days` days, oldest first.
+    """
+
+    def __init__(self, expenses, today=None, recent_limit=6, series_days=30):
+        today = today or date.today()
+        today_ordinal = today.toordinal()
+        month_start = today.replace(day=1).toordinal()
+
+        week = month = year = month_to_date = 0
+        daily = [0] * series_days
+        category_totals = {}
+        # At most a year of (day, category, account) cells, however many expenses there are
+        for ordinal, code, _, amount in expenses.aggregates.cells_between(today_ordinal - 364, today_ordinal):
+            age = today_ordinal - ordinal
+            year += amount
+            if ordinal >= month_start:
+                month_to_date += amount
+            if age < series_days:
+                daily[series_days - 1 - age] += amount
+            if age < 30:
+                month += amount
+                category_totals[code] = category_totals.get(code, 0) + amount
+                if age < 7:
+                    week += amount
+
+        self.week_total = week / MINOR_UNITS
+        self.month_total = month / MINOR_UNITS
+        self.year_total = year / MINOR_UNITS
+        self.month_to_date_total = month_to_date / MINOR_UNITS
+        self.daily_totals = [amount / MINOR_UNITS for amount in daily]
+
+        # Stored names vary in case, merge them under the capitalized form shown in the UI
+        breakdown = {}
+        for code, amount in category_totals.items():
+            category = expenses.categories[code].capitalize()
+            breakdown[category] = breakdown.get(category, 0) + amount
+        self.category_breakdown = sorted(
+            ((category, amount / MINOR_UNITS) for category, amount in breakdown.items()),
+            key=lambda item: item[1], reverse=True
+        )
+
+        # analytics brings numpy, imported here so it loads after login rather than before the login screen
+        from analytics import frame_for
+        rows = frame_for(expenses).recent_rows(recent_limit)
+        self.recent_transactions = [expenses[row] for row in rows]
@@ -0,0 +1,135 @@
+import calendar
+import re
+from datetime import date, timedelta
+import analytics
+
+# Every word of a question answer() takes has to be one of these. Anything else, a category,
+# a merchant, a comparison or a request for advice, is a qualifier answer() would ignore,
+# so the question goes to the AI instead.
+FILLER_WORDS = {
+    "please", "can", "could", "you", "me", "my", "i", "a", "the", "of", "from", "for", "in", "on",
+    "what", "which", "s", "is", "are", "was", "am", "do", "did", "have", "has", "been", "so", "far",
+    "give", "show", "tell", "summarize", "summarise", "summary", "overview", "how", "much",
+    "this", "past", "last", "expenses", "expense", "spending", "spend", "spent", "transactions"
+}
+WEEK_WORDS = {"week", "weekly"}
+MONTH_WORDS = {"month", "monthly"}
+CATEGORY_WORDS = {"category", "categories", "top", "biggest", "largest", "most", "main"}
+BUDGET_WORDS = {"budget", "over", "under", "within", "exceeded", "exceed", "left", "remaining", "status"}
+KNOWN_WORDS = FILLER_WORDS | WEEK_WORDS | MONTH_WORDS | CATEGORY_WORDS | BUDGET_WORDS
+
+
+def question_intent(question):
+    """Which of the questions answer() can work out from the data this is, or None."""
+    tokens = re.findall(r"[a-z]+", question.lower())
+    words = set(tokens)
+    if not words <= KNOWN_WORDS:
+        return None
+    week = bool(words & WEEK_WORDS)
+    month = bool(words & MONTH_WORDS)
+    # The month answers cover the last 30 days, not the calendar month before this one
+    if any(word in ("last", "past") and following == "month" for word, following in zip(tokens, tokens[1:])):
+        return None
+    if "budget" in words:
+        return "budget" if not week and not words & CATEGORY_WORDS else None
+    if words & {"category", "categories"}:
+        return "categories" if not week else None
+    if week != month:
+        return "week" if week else "month"
+    return None
+
+
+def answer(question, expenses, currency_symbol, monthly_budget, today=None):
+    """Markdown answer to a common question about expenses, None when it needs the AI."""
+    intent = question_intent(question)
+    if intent is None:
+        return None
+    if not expenses:
+        return "### 📭 No Expenses Yet\n\nAdd a few expenses and I can summarize them for you."
+
+    frame = analytics.frame_for(expenses)
+    today = today or date.today()
+    if intent == "week":
+        return _period_summary(frame, currency_symbol, today, 7, "📊 Your Weekly Summary", "week")
+    if intent == "month":
+        summary = _period_summary(frame, currency_symbol, today, 30, "📅 Your Monthly Overview", "30 days")
+        if monthly_budget > 0:
+            summary += "\n\n" + _budget_lines(frame, currency_symbol, monthly_budget, today)
+        return summary
+    if intent == "categories":
+        return _top_categories(frame, currency_symbol, today)
+    if monthly_budget <= 0:
+        return "### 🎯 Budget Status\n\nYou haven't set a monthly budget yet. Set one from the dashboard to track it here."
+    return "### 🎯 Budget Status\n\n" + _budget_lines(frame, currency_symbol, monthly_budget, today)
+
+
+def _money(currency_symbol, amount):
+    return f"{currency_symbol}{amount:,.2f}"
+
+
+def _breakdown(totals, total, currency_symbol, limit):
+    lines = []
+    for name, amount in totals[:limit]:
+        percentage = (amount / total * 100) if total > 0 else 0
+        lines.append(f"- {name}: {_money(currency_symbol, amount)} ({percentage:.1f}%)")
+    return "\n".join(lines)
+
+
+def _period_summary(frame, currency_symbol, today, days, heading, period_name):
+    # Calendar days ending today, and the same number of days before them for comparison
+    start = today - timedelta(days=days - 1)
+    mask = frame.mask_between(start, today)
+    previous_mask = frame.mask_between(start - timedelta(days=days), start - timedelta(days=1))
+    total = frame.total(mask)
+    count = frame.count(mask)
+    previous_total = frame.total(previous_mask)
+
+    lines = [
+        f"### {heading}",
+        f"*{start.strftime('%b %d')} – {today.strftime('%b %d, %Y')}*",
+        f"**Total Spent**: {_money(currency_symbol, total)} across {count} transactions",
+        f"**Daily Average**: {_money(currency_symbol, total / days)}"
+    ]
+    if previous_total > 0:
+        change = (total - previous_total) / previous_total * 100
+        arrow = "📈" if change > 0 else "📉"
+        lines.append(f"**Compared with the previous {period_name}**: {arrow} {change:+.1f}% "
+                     f"(was {_money(currency_symbol, previous_total)})")
+    if count:
+        lines.append("**Top Categories**:\n" + _breakdown(frame.sum_by_category(mask), total, currency_symbol, 5))
+    else:
+        lines.append(f"No expenses recorded in this {period_name}.")
+    return "\n\n".join(lines)
+
+
+def _top_categories(frame, currency_symbol, today):
+    mask = frame.mask_between(today - timedelta(days=29), today)
+    lines = ["### 🏷️ Your Top Categories"]
+    if frame.count(mask):
+        lines.append("**Last 30 Days**:\n" + _breakdown(frame.sum_by_category(mask), frame.total(mask), currency_symbol, 5))
+    lines.append("**All Time**:\n" + _breakdown(frame.sum_by_category(), frame.total(), currency_symbol, 5))
+    return "\n\n".join(lines)
+
+
+def _budget_lines(frame, currency_symbol, monthly_budget, today):
+    # Month to date like the dashboard's budget card, projected to the end of the month at the current pace
+    spent = frame.total(frame.mask_between(today.replace(day=1), today))
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    days_left = days_in_month - today.day
+    projected = spent / today.day * days_in_month
+    remaining = monthly_budget - spent
+
+    lines = [
+        f"**Budget**: {_money(currency_symbol, monthly_budget)}",
+        f"**Spent This Month**: {_money(currency_symbol, spent)} ({spent / monthly_budget * 100:.1f}%)"
+    ]
+    if remaining < 0:
+        lines.append(f"⚠️ **Over budget** by {_money(currency_symbol, -remaining)}")
+    else:
+        lines.append(f"✅ **Remaining**: {_money(currency_symbol, remaining)}")
+        if days_left:
+            lines.append(f"**Daily Allowance**: {_money(currency_symbol, remaining / days_left)} for the {days_left} days left")
+    if remaining >= 0 and projected > monthly_budget:
+        lines.append(f"📈 At this pace you'll spend about {_money(currency_symbol, projected)} this month, "
+                     f"{_money(currency_symbol, projected - monthly_budget)} over budget")
+    return "\n\n".join(lines)
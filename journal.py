@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from persistence import atomic_write
+
+
+class TransactionJournal:
+    """Append-only log of changes made since the last snapshot.
+
+    Every entry carries a sequence number. The snapshot remembers the last
+    sequence it already contains, so replaying after a crash between writing
+    the snapshot and trimming the journal never applies an entry twice.
+
+    append() only buffers the entry; write_pending() puts buffered entries on
+    disk and is meant to run on the write-behind thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.last_seq = 0
+        self.entry_count = 0
+        self.pending_lines = []
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        self.last_seq += 1
+        entry = dict(record, seq=self.last_seq)
+        with self.lock:
+            self.pending_lines.append(json.dumps(entry) + "\n")
+        self.entry_count += 1
+        return self.last_seq
+
+    def write_pending(self):
+        with self.lock:
+            lines, self.pending_lines = self.pending_lines, []
+        if not lines:
+            return
+        data = "".join(lines).encode('utf-8')
+        try:
+            with open(self.path, 'a+b') as f:
+                # A crash mid-append leaves a torn line without its newline, start on a fresh line after it
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            # Keep them for the next attempt, ahead of anything appended meanwhile
+            with self.lock:
+                self.pending_lines[:0] = lines
+            raise
+
+    def read(self, after_seq=0):
+        """Return the entries newer than after_seq, in the order they were written."""
+        entries = []
+        if not os.path.exists(self.path):
+            self.last_seq = after_seq
+            self.entry_count = 0
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn line from an interrupted append, the entries around it are intact
+                    continue
+                if entry.get("seq", 0) > after_seq:
+                    entries.append(entry)
+
+        self.last_seq = max([after_seq] + [entry["seq"] for entry in entries])
+        self.entry_count = len(entries)
+        return entries
+
+    def discard_through(self, seq):
+        """Drop the entries a snapshot up to seq already contains, keeping any newer ones."""
+        self.write_pending()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            remaining = [line for line in f if line.strip() and self._line_seq(line) > seq]
+        if remaining:
+            atomic_write(self.path, "".join(remaining))
+        else:
+            os.remove(self.path)
+
+    def truncate(self):
+        """Drop every entry, for journals that are not written through the write-behind thread."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.entry_count = 0
+
+    def _line_seq(self, line):
+        try:
+            return json.loads(line).get("seq", 0)
+        except ValueError:
+            return 0
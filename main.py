@@ -4,6 +4,7 @@ from tkinter import messagebox
 import config 
 from auth_manager import AuthManager 
 from ui_manager import UIManager 
+import response_cache
 
 class LoginSignupApp:
     def __init__(self, root):
@@ -29,6 +30,14 @@ class LoginSignupApp:
         self.ui_manager = UIManager(root, self.auth_manager, self) 
         
         self.ui_manager.show_login_screen()
+        self.root.after(config.WRITE_ERROR_CHECK_MS, self._check_write_errors)
+    
+    def _check_write_errors(self):
+        # Saves happen on a background thread, so their failures are reported from here
+        error = self.auth_manager.take_write_error()
+        if error is not None:
+            messagebox.showerror("Error", f"Your latest changes could not be saved: {error}")
+        self.root.after(config.WRITE_ERROR_CHECK_MS, self._check_write_errors)
     
     def handle_login(self, email, password):
         success, message, user_name = self.auth_manager.login(email, password)
@@ -69,7 +78,12 @@ class LoginSignupApp:
 def main():
     root = tk.Tk()
     app = LoginSignupApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # Saves run on a background thread, make sure they reach the disk before exiting
+        app.auth_manager.close()
+        response_cache.close_shared_cache()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import traceback
+import config
+
+
+def atomic_write(path, data):
+    """Replace path with data (str or bytes) so readers see either the old file or the new one, never half of each."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Make the rename itself durable where the platform lets us open directories
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class WriteBehindPersister:
+    """Runs file writes on a background thread so the Tk main loop never waits on the disk.
+
+    Jobs are submitted under a key. Submitting again for a key that has not
+    been written yet replaces the earlier job. Writes start `delay` seconds
+    after the first job of a batch, so every save to the same file within
+    that window collapses into a single write, and a steady stream of saves
+    is still written at least that often.
+    """
+
+    def __init__(self, delay=None):
+        self.delay = config.WRITE_BEHIND_DELAY if delay is None else delay
+        self.pending = {}
+        self.in_flight = False
+        self.flush_requested = False
+        self.closed = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def submit(self, key, job):
+        with self.condition:
+            if not self.closed:
+                self.pending[key] = job
+                self.condition.notify_all()
+                return
+        # Shutting down, nobody is left to run it later
+        job()
+
+    def flush(self):
+        """Block until everything submitted so far has been attempted, see take_error() for failures."""
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.pending or self.in_flight:
+                self.condition.wait()
+            self.flush_requested = False
+
+    def take_error(self):
+        """The last write error since the previous call, or None."""
+        with self.condition:
+            error, self.error = self.error, None
+        return error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                # Gather what else is saved within the delay, so each file is written once
+                self.condition.wait_for(lambda: self.flush_requested or self.closed, timeout=self.delay)
+                jobs = list(self.pending.values())
+                self.pending.clear()
+                self.in_flight = True
+
+            error = None
+            for job in jobs:
+                try:
+                    job()
+                except Exception as e:
+                    traceback.print_exc()
+                    error = e
+
+            with self.condition:
+                if error is not None:
+                    self.error = error
+                self.in_flight = False
+                self.condition.notify_all()
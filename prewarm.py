@@ -0,0 +1,32 @@
+import threading
+import traceback
+
+_started = False
+
+
+def start():
+    """Import numpy and matplotlib on a background thread, once per run.
+
+    Started with the login screen, so by the time the user has typed their
+    credentials the slow part of importing the dashboard is done and
+    show_dashboard() does not stall on it. matplotlib builds its font list
+    while being imported. An import the Tk thread needs while this is still
+    running waits for it to finish rather than starting over.
+    """
+    global _started
+    if _started:
+        return
+    _started = True
+    threading.Thread(target=_warm, name="prewarm", daemon=True).start()
+
+
+def _warm():
+    try:
+        # Only modules that do no Tk work at import. backend_tkagg and user_dashboard are left to the
+        # Tk thread, they take about 20 ms once these are loaded.
+        import analytics
+        import matplotlib.figure
+        import matplotlib.patches
+    except Exception:
+        # Only a head start, the dashboard imports the same modules itself and reports any real failure
+        traceback.print_exc()
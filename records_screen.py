@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from bisect import bisect_right
 from datetime import datetime, timedelta
 from tkcalendar import DateEntry
 import config
+from virtual_list import VirtualList
 
 # Define periods for filtering
 periods = [
@@ -14,6 +16,50 @@ periods = [
     ("Custom", "Custom")
 ]
 
+HEADER_HEIGHT = 30
+ROW_HEIGHT = 90
+
+
+class MonthSections:
+    """VirtualList layout for an ExpenseRange: a month header followed by that month's cards."""
+
+    def __init__(self, expenses):
+        self.expenses = expenses
+        self.sections = []
+        self.tops = []
+        y = 0
+        for month_start, position, count in expenses.months():
+            self.sections.append((month_start, position, count))
+            self.tops.append(y)
+            y += HEADER_HEIGHT + count * ROW_HEIGHT
+        self.total_height = y
+
+    def height(self):
+        return self.total_height
+
+    def rows_between(self, top, bottom):
+        section = max(bisect_right(self.tops, top) - 1, 0)
+        while section < len(self.sections) and self.tops[section] < bottom:
+            month_start, position, count = self.sections[section]
+            y = self.tops[section]
+            if y + HEADER_HEIGHT > top:
+                yield ("month", month_start), "month", y, HEADER_HEIGHT, month_start.strftime('%B %Y')
+            first = max(int((top - y - HEADER_HEIGHT) // ROW_HEIGHT), 0)
+            for row in range(first, count):
+                row_y = y + HEADER_HEIGHT + row * ROW_HEIGHT
+                if row_y >= bottom:
+                    break
+                yield ("card", position + row), "card", row_y, ROW_HEIGHT, self.expenses[position + row]
+            section += 1
+
+
+class EmptySections:
+    def height(self):
+        return 0
+
+    def rows_between(self, top, bottom):
+        return ()
+
 def display_records_screen(root, auth_manager, dashboard_instance):
     print("display_records_screen called!")
     modal = tk.Toplevel(root)
@@ -97,9 +143,9 @@ def display_records_screen(root, auth_manager, dashboard_instance):
     user_data = auth_manager.get_current_user_data()
     currency = user_data.get('currency', 'INR')
     currency_symbol = '₹' if currency == 'INR' else '$'
-    expenses = user_data.get('expenses', [])
 
     total_amount = tk.StringVar(value="0.00")
+    top_categories = tk.StringVar(value="")
     period_label_text = tk.StringVar(value="LAST 1 YEAR")
 
     summary_header = tk.Label(
@@ -120,7 +166,17 @@ def display_records_screen(root, auth_manager, dashboard_instance):
         fg=config.TEXT_DARK,
         anchor="e"
     )
-    summary_amount.pack(fill=tk.X, padx=15, pady=(0, 15))
+    summary_amount.pack(fill=tk.X, padx=15, pady=(0, 5))
+
+    summary_categories = tk.Label(
+        summary_frame,
+        textvariable=top_categories,
+        font=("Segoe UI", 10),
+        bg=config.WHITE,
+        fg=config.TEXT_LIGHT,
+        anchor="e"
+    )
+    summary_categories.pack(fill=tk.X, padx=15, pady=(0, 15))
 
     list_outer_container = tk.Frame(main_frame, bg=config.BG_LIGHT)
     list_outer_container.pack(fill=tk.BOTH, expand=True, padx=15, pady=0)
@@ -128,24 +184,24 @@ def display_records_screen(root, auth_manager, dashboard_instance):
     list_container = tk.Frame(list_outer_container, bg=config.WHITE)
     list_container.pack(fill=tk.BOTH, expand=True, padx=0, pady=10)
 
-    canvas = tk.Canvas(list_container, bg=config.WHITE, highlightthickness=0)
-    scrollbar = tk.Scrollbar(list_container, orient="vertical", command=canvas.yview)
-    scrollable_frame = tk.Frame(canvas, bg=config.WHITE)
-
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+    # Only the cards in view exist as widgets, so long ranges scroll without building thousands of frames
+    records_list = VirtualList(list_container, {
+        "month": lambda parent: create_month_header(parent),
+        "card": lambda parent: create_transaction_card(parent),
+    }, bg=config.WHITE)
+    records_list.pack()
+
+    empty_label = tk.Label(
+        list_container,
+        text="No expenses found for this period",
+        font=("Segoe UI", 12),
+        bg=config.WHITE,
+        fg=config.TEXT_DARK
     )
 
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
-
-    canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
     def _on_mousewheel(event):
-        canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-    canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        records_list.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+    records_list.canvas.bind_all("<MouseWheel>", _on_mousewheel)
 
     category_icons = {
         'FOOD': '🍔',
@@ -171,84 +227,95 @@ def display_records_screen(root, auth_manager, dashboard_instance):
         'Education': '#2ECC71'
     }
 
-    def create_transaction_card(parent, expense_data, month_label=None):
-        """Create a transaction card"""
-        if month_label:
-            separator = tk.Frame(parent, bg=config.WHITE, height=30)
-            separator.pack(fill=tk.X)
-            tk.Label(
-                separator,
-                text=month_label,
-                font=("Segoe UI", 12, "bold"),
-                bg=config.WHITE,
-                fg=config.TEXT_DARK
-            ).pack(side=tk.LEFT, padx=15)
-
-        card = tk.Frame(parent, bg=config.WHITE, bd=0, relief=tk.FLAT)
-        card.pack(fill=tk.X, padx=15, pady=5)
+    def create_month_header(parent):
+        """Create a reusable month separator, returns it with a function that sets its label"""
+        separator = tk.Frame(parent, bg=config.WHITE, height=HEADER_HEIGHT)
+        month_label = tk.Label(
+            separator,
+            font=("Segoe UI", 12, "bold"),
+            bg=config.WHITE,
+            fg=config.TEXT_DARK
+        )
+        month_label.pack(side=tk.LEFT, padx=15)
+        return separator, lambda text: month_label.configure(text=text)
 
-        category = expense_data.get('category', 'OTHERS')
-        icon = category_icons.get(category, '📦')
-        color = category_colors.get(category, '#95A5A6')
+    def create_transaction_card(parent):
+        """Create a reusable transaction card, returns it with a function that shows an expense in it"""
+        row = tk.Frame(parent, bg=config.WHITE)
+        card = tk.Frame(row, bg=config.WHITE, bd=0, relief=tk.FLAT)
+        card.pack(fill=tk.X, padx=15, pady=5)
 
         icon_canvas = tk.Canvas(card, width=50, height=50, bg=config.WHITE, highlightthickness=0)
         icon_canvas.pack(side=tk.LEFT, padx=15, pady=15)
         
-        icon_canvas.create_oval(5, 5, 45, 45, fill=color, outline="")
+        icon_oval = icon_canvas.create_oval(5, 5, 45, 45, outline="")
         
-        icon_canvas.create_text(25, 25, text=icon, font=("Segoe UI", 20))
+        icon_text = icon_canvas.create_text(25, 25, font=("Segoe UI", 20))
 
         details_frame = tk.Frame(card, bg=config.WHITE)
         details_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=15)
 
-        category_display = category.replace('_', ', ').title()
-        tk.Label(
+        category_label = tk.Label(
             details_frame,
-            text=category_display,
             font=("Segoe UI", 13, "bold"),
             bg=config.WHITE,
             fg=config.TEXT_DARK,
             anchor="w"
-        ).pack(fill=tk.X)
+        )
+        category_label.pack(fill=tk.X)
 
-        account = expense_data.get('account', 'Cash')
-        tk.Label(
+        account_label = tk.Label(
             details_frame,
-            text=account.title(),
             font=("Segoe UI", 11),
             bg=config.WHITE,
             fg=config.TEXT_LIGHT,
             anchor="w"
-        ).pack(fill=tk.X)
+        )
+        account_label.pack(fill=tk.X)
 
         amount_frame = tk.Frame(card, bg=config.WHITE)
         amount_frame.pack(side=tk.RIGHT, pady=15, padx=15)
 
-        amount = expense_data.get('amount', 0)
-        tk.Label(
+        amount_label = tk.Label(
             amount_frame,
-            text=f"{currency_symbol}{amount:.2f}",
             font=("Segoe UI", 13, "bold"),
             bg=config.WHITE,
             fg=config.TEXT_DARK,
             anchor="e"
-        ).pack()
+        )
+        amount_label.pack()
 
-        date = expense_data.get('date', '')
-        tk.Label(
+        date_label = tk.Label(
             amount_frame,
-            text=date,
             font=("Segoe UI", 11),
             bg=config.WHITE,
             fg=config.TEXT_LIGHT,
             anchor="e"
-        ).pack()
+        )
+        date_label.pack()
+
+        def show(expense_data):
+            category = expense_data.category
+            icon_canvas.itemconfigure(icon_oval, fill=category_colors.get(category, '#95A5A6'))
+            icon_canvas.itemconfigure(icon_text, text=category_icons.get(category, '📦'))
+            category_label.configure(text=category.replace('_', ', ').title())
+            account_label.configure(text=expense_data.account.title())
+            amount_label.configure(text=f"{currency_symbol}{expense_data.amount:.2f}")
+            date_label.configure(text=expense_data.date.isoformat())
+
+        return row, show
+
+    def show_expenses(expenses):
+        """Point the list at a range of expenses, or show the empty message"""
+        if len(expenses):
+            empty_label.place_forget()
+            records_list.set_model(MonthSections(expenses))
+        else:
+            records_list.set_model(EmptySections())
+            empty_label.place(relx=0.5, y=20, anchor="n")
 
     def filter_expenses_by_period(period, start_date=None, end_date=None):
         """Filter expenses based on selected period"""
-        for widget in scrollable_frame.winfo_children():
-            widget.destroy()
-
         today = datetime.now().date()
         if period == "custom":
             start_range = start_date
@@ -274,48 +341,17 @@ def display_records_screen(root, auth_manager, dashboard_instance):
             end_range = today
             period_label_text.set("LAST 1 YEAR")
 
-        # Filter and sort expenses
-        filtered_expenses = []
-        period_total = 0
-
-        for expense in expenses:
-            try:
-                expense_date = datetime.strptime(expense.get('date', ''), '%Y-%m-%d').date()
-                if start_range <= expense_date <= end_range:
-                    filtered_expenses.append(expense)
-                    period_total += expense.get('amount', 0)
-            except ValueError:
-                continue  # Skip invalid dates
+        # Range filtering and the total come from the storage backend, cards are only read as they scroll into view
+        filtered_expenses = auth_manager.get_expense_range(start_range, end_range)
+        period_total = auth_manager.get_total_between(start_range, end_range)
+        category_totals = auth_manager.sum_by_category(start_range, end_range)
 
-        # Update total amount
+        # Update total amount and the biggest categories under it
         total_amount.set(f"{currency_symbol}{period_total:.2f}")
+        top_categories.set("  ·  ".join(
+            f"{category.replace('_', ', ').title()} {currency_symbol}{amount:.2f}" for category, amount in category_totals[:3]))
 
-        if not filtered_expenses:
-            # Show a message if no expenses found
-            empty_label = tk.Label(
-                scrollable_frame,
-                text="No expenses found for this period",
-                font=("Segoe UI", 12),
-                bg=config.WHITE,
-                fg=config.TEXT_DARK
-            )
-            empty_label.pack(pady=20)
-            return
-
-        # Sort expenses by date
-        filtered_expenses.sort(key=lambda x: x.get('date', ''), reverse=True)
-
-        # Group by month and create cards
-        current_month = None
-        for expense in filtered_expenses:
-            expense_date = datetime.strptime(expense.get('date', ''), '%Y-%m-%d')
-            month_year = expense_date.strftime('%B %Y')
-
-            if month_year != current_month:
-                current_month = month_year
-                create_transaction_card(scrollable_frame, expense, month_year)
-            else:
-                create_transaction_card(scrollable_frame, expense)
+        show_expenses(filtered_expenses)
 
     def show_custom_date_picker():
         """Show custom date range picker"""
@@ -370,9 +406,9 @@ def display_records_screen(root, auth_manager, dashboard_instance):
                 messagebox.showinfo("No Data", "No expenses available for future dates")
                 period_label_text.set(f"CUSTOM: {start_date.strftime('%d %b %Y')} - {end_date.strftime('%d %b %Y')}")
                 total_amount.set(f"{currency_symbol}0.00")
+                top_categories.set("")
                 # Clear existing cards
-                for widget in scrollable_frame.winfo_children():
-                    widget.destroy()
+                show_expenses(())
                 selected_period.set("Custom")
                 update_period_buttons()
                 date_modal.destroy()
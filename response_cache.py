@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+import config
+from persistence import WriteBehindPersister, atomic_write
+
+
+def cache_key(question, context, model_name):
+    """Key for an answer: the question's words, a hash of the data it was asked about, and the model."""
+    words = " ".join(re.findall(r"\w+", question.lower()))
+    digest = hashlib.sha256(context.encode('utf-8')).hexdigest()
+    return f"{model_name}|{digest}|{words}"
+
+
+class ResponseCache:
+    """AI answers kept on disk, least recently used first out.
+
+    Entries older than max_age seconds are dropped when looked up or when
+    the cache is saved, and the oldest-used entries go once there are more
+    than max_entries. Saves happen on a write-behind thread; this is only a
+    cache, so an answer lost at exit costs no more than one request.
+    """
+
+    def __init__(self, path=None, max_entries=None, max_age=None):
+        self.path = path or config.AI_CACHE_FILE
+        self.max_entries = max_entries or config.AI_CACHE_MAX_ENTRIES
+        self.max_age = max_age or config.AI_CACHE_MAX_AGE
+        self.entries = OrderedDict()
+        # Lookups answered and missed since start, to see how often the cache saves a request
+        self.hits = 0
+        self.misses = 0
+        self.persister = WriteBehindPersister()
+        self._load()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        text, created = entry
+        if time.time() - created > self.max_age:
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        self.entries[key] = (text, time.time())
+        self.entries.move_to_end(key)
+        self._evict()
+        self._save()
+
+    def _evict(self):
+        oldest_allowed = time.time() - self.max_age
+        for key in [key for key, (_, created) in self.entries.items() if created < oldest_allowed]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            # A damaged cache is just an empty one
+            return
+        for key, text, created in saved:
+            self.entries[key] = (text, created)
+        self._evict()
+
+    def close(self):
+        """Write whatever is still pending, called once when the app exits."""
+        self.persister.close()
+
+    def _save(self):
+        data = json.dumps([[key, text, created] for key, (text, created) in self.entries.items()])
+        self.persister.submit(self.path, lambda: atomic_write(self.path, data))
+
+
+_shared_cache = None
+
+
+def shared_cache():
+    """The ResponseCache every Summary screen uses, loaded on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache()
+    return _shared_cache
+
+
+def close_shared_cache():
+    if _shared_cache is not None:
+        _shared_cache.close()
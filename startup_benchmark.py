@@ -0,0 +1,82 @@
+"""Time from a cold interpreter to the login screen.
+
+Each run starts a fresh Python, imports main and, when a display is
+available, builds the login screen and waits for Tk to draw it. --eager
+also imports the dashboard and every screen behind it up front, the way
+the app started before they were loaded on first use, for a before/after
+comparison:
+
+    python startup_benchmark.py
+    python startup_benchmark.py --eager
+
+Runs happen in an empty temporary directory, so the app finds no users.json
+of its own and never touches real data. The login screen's background
+prewarm is off unless --prewarm is given, so its imports don't land in the
+measurement by chance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ["numpy", "matplotlib", "tkcalendar", "reportlab", "dotenv", "google.generativeai"]
+EAGER_MODULES = ["user_dashboard", "add_expenses", "records_screen", "all_transactions_screen", "summary_screen"]
+
+RUN = """
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+if not {prewarm!r}:
+    import prewarm
+    prewarm._started = True
+start = time.perf_counter()
+import main
+for name in {eager!r}:
+    __import__(name)
+imported = time.perf_counter() - start
+shown = None
+try:
+    root = main.tk.Tk()
+except main.tk.TclError:
+    root = None
+if root is not None:
+    app = main.LoginSignupApp(root)
+    root.update()
+    shown = time.perf_counter() - start
+    root.destroy()
+    app.auth_manager.close()
+print(json.dumps({{"import": imported, "login": shown, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(eager, prewarm):
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    code = RUN.format(app_dir=app_dir, prewarm=prewarm, eager=EAGER_MODULES if eager else [], heavy=HEAVY_MODULES)
+    # Data files are relative to the working directory, a fresh one per run keeps them apart from the real ones
+    with tempfile.TemporaryDirectory() as data_dir:
+        result = subprocess.run([sys.executable, "-c", code], cwd=data_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--eager", action="store_true", help="also import the dashboard and its screens at startup")
+    parser.add_argument("--prewarm", action="store_true", help="let the login screen start its background imports")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once(args.eager, args.prewarm) for _ in range(args.runs)]
+    print(f"import main: {statistics.median(r['import'] for r in runs) * 1000:.0f} ms (median of {args.runs})")
+    if runs[0]["login"] is None:
+        print("login screen: no display, not measured")
+    else:
+        print(f"login screen: {statistics.median(r['login'] for r in runs) * 1000:.0f} ms (median of {args.runs})")
+    print("heavy modules loaded: " + (", ".join(runs[0]["loaded"]) or "none"))
+
+
+if __name__ == "__main__":
+    main()
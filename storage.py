@@ -0,0 +1,577 @@
+import hashlib
+import json
+import os
+import re
+import heapq
+import shutil
+import sqlite3
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import config
+from expense_store import MINOR_UNITS, Expense, ExpenseRange, ExpenseStore
+from journal import TransactionJournal
+from persistence import WriteBehindPersister, atomic_write
+
+ACCOUNT_BALANCE_FIELDS = {
+    "CASH": "cash_balance",
+    "BANK": "bank_balance",
+    "CREDIT CARD": "credit_card_balance"
+}
+
+USER_FIELDS = (
+    "name", "password", "created_at", "monthly_budget", "currency",
+    "cash_balance", "bank_balance", "credit_card_balance"
+)
+
+EXPENSE_FIELDS = ("amount", "category", "account", "date", "timestamp")
+
+INDEX_FIELDS = ("name", "password", "created_at")
+
+# Bumped whenever AuthManager gains a one-off migration for existing user data
+USER_SCHEMA_VERSION = 1
+
+SHARD_MAGIC = b"EXPU"
+SHARD_VERSION = 1
+SHARD_HEADER = struct.Struct("<4sHI")  # magic, version, profile JSON length
+
+
+def expense_store(user_data):
+    """The user's ExpenseStore, converting a plain list of expense dicts in place."""
+    expenses = user_data.get("expenses")
+    if not isinstance(expenses, ExpenseStore):
+        expenses = user_data["expenses"] = ExpenseStore.from_dicts(expenses or [])
+    return expenses
+
+
+def apply_expense(user_data, expense):
+    """Append an expense to a user and charge it to the matching account balance.
+
+    Returns the stored Expense, whose amount is rounded to minor units.
+    """
+    if not isinstance(expense, Expense):
+        expense = Expense.from_dict(expense)
+    expense_store(user_data).append(expense)
+    balance_field = ACCOUNT_BALANCE_FIELDS.get(expense.account)
+    if balance_field:
+        user_data[balance_field] = user_data.get(balance_field, 0.0) - expense.amount
+    return expense
+
+
+def apply_entry(user_data, entry):
+    """Apply one change record (as written by AuthManager) to a user's in-memory data."""
+    if entry["op"] == "expense":
+        apply_expense(user_data, entry["expense"])
+    elif entry["op"] == "budget":
+        user_data["monthly_budget"] = entry["monthly_budget"]
+        user_data["currency"] = entry["currency"]
+
+
+def iso_ordinal(iso_date):
+    return date.fromisoformat(iso_date).toordinal() if iso_date is not None else None
+
+
+def loaded_expenses_between(user_data, start_date=None, end_date=None):
+    """Expenses of already loaded user data dated within [start_date, end_date], newest first."""
+    expenses = expense_store(user_data)
+    rows = expenses.date_index().rows_between(iso_ordinal(start_date), iso_ordinal(end_date))
+    return [expenses[row] for row in reversed(rows)]
+
+
+def loaded_expense_range(user_data, start_date=None, end_date=None):
+    """ExpenseRange view of already loaded user data, rows are only read on access."""
+    expenses = expense_store(user_data)
+    index = expenses.date_index()
+    low, high = index.bounds(iso_ordinal(start_date), iso_ordinal(end_date))
+    return ExpenseRange(expenses, index, low, high)
+
+
+def loaded_search_expenses(user_data, query, limit=None):
+    """Expenses in loaded user data matching the search query, newest first, None for an empty query."""
+    expenses = expense_store(user_data)
+    rows = expenses.search_index().search(query)
+    if rows is None:
+        return None
+    if limit is None:
+        rows = sorted(rows, key=expenses.timestamps.__getitem__, reverse=True)
+    else:
+        rows = heapq.nlargest(limit, rows, key=expenses.timestamps.__getitem__)
+    return [expenses[row] for row in rows]
+
+
+class JsonStorage:
+    """users.json credentials index plus one snapshot and journal per user.
+
+    The index only holds what login needs, so opening the app never parses
+    anybody's expense history. Each user's data lives in its own shard under
+    data_dir and is read by load_user() once that user has logged in. A shard
+    is a small JSON profile followed by the user's ExpenseStore columns, so
+    it loads with a single read.
+
+    Writes are handed to a write-behind thread and land via atomic_write, so
+    neither the Tk main loop nor a crash part way through a save can leave a
+    half-written file behind.
+    """
+
+    def __init__(self, index_file, data_dir, legacy_journal_file):
+        self.index_file = index_file
+        self.data_dir = data_dir
+        self.legacy_journal_file = legacy_journal_file
+        self.index = {}
+        self.journals = {}
+        # (mtime, size) of the files as we last read or wrote them, to spot edits by another process
+        self.index_version = None
+        self.user_versions = {}
+        self.persister = WriteBehindPersister()
+        # Held by write jobs from writing a file until its new version is recorded
+        self.version_lock = threading.Lock()
+        # The shard being read ahead of login by preload_user(), as {email: Future}
+        self.preloads = {}
+        self.preload_executor = ThreadPoolExecutor(max_workers=1)
+
+    def exists(self):
+        return os.path.exists(self.index_file) or os.path.exists(self.legacy_journal_file)
+
+    def load_index(self):
+        self.persister.flush()
+        index = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+
+        legacy_journal_only = not index and os.path.exists(self.legacy_journal_file)
+        # The single-file format kept the journal position next to the users
+        if legacy_journal_only or "_journal_seq" in index or any("shard" not in entry for entry in index.values()):
+            index = self._split_legacy_file(index)
+
+        self.index = index
+        self.index_version = self._file_version(self.index_file)
+        return index
+
+    def index_changed(self):
+        return self._changed_since_our_writes(lambda: self._file_version(self.index_file) != self.index_version)
+
+    def user_changed(self, email):
+        return self._changed_since_our_writes(lambda: self._user_version(email) != self.user_versions.get(email))
+
+    def _changed_since_our_writes(self, differs):
+        # Our writes record the version they leave behind, so any other difference is another process.
+        # A write of ours in progress has not recorded its version yet, the next check sees past it.
+        if not self.version_lock.acquire(blocking=False):
+            return False
+        try:
+            return differs()
+        finally:
+            self.version_lock.release()
+
+    def take_write_error(self):
+        """The last failed background save since the previous call, or None."""
+        return self.persister.take_error()
+
+    def load_user(self, email):
+        self.persister.flush()
+        user_data = {}
+        snapshot_seq = 0
+        shard_path = self._shard_path(email)
+        legacy_shard_path = self._legacy_shard_path(email)
+        preload = self.preloads.pop(email, None)
+        self._drop_preloads()
+        if os.path.exists(shard_path):
+            user_data = self._preloaded_shard(preload, shard_path)
+            if user_data is None:
+                with open(shard_path, 'rb') as f:
+                    user_data = self._decode_shard(f.read())
+            snapshot_seq = user_data.pop("_journal_seq", 0)
+        elif os.path.exists(legacy_shard_path):
+            with open(legacy_shard_path, 'r') as f:
+                user_data = json.load(f)
+            snapshot_seq = user_data.pop("_journal_seq", 0)
+        expense_store(user_data)
+
+        journal = self._journal(email)
+        # Replay everything recorded since the snapshot was written
+        for entry in journal.read(after_seq=snapshot_seq):
+            apply_entry(user_data, entry)
+
+        if journal.entry_count >= config.JOURNAL_COMPACT_THRESHOLD or os.path.exists(legacy_shard_path):
+            # Also rewrites a JSON shard from before the binary format
+            self.save_user(email, user_data)
+        self.user_versions[email] = self._user_version(email)
+        return user_data
+
+    def preload_user(self, email):
+        """Start decoding email's shard on a background thread, so a load_user() soon after finds it ready."""
+        if email in self.preloads or not os.path.exists(self._shard_path(email)):
+            return
+        # Only the latest address is worth keeping, a decoded shard can be large
+        self._drop_preloads()
+        self.preloads[email] = self.preload_executor.submit(self._read_shard, email)
+
+    def _drop_preloads(self):
+        # A read already running finishes, its result is let go with the Future
+        for preload in self.preloads.values():
+            preload.cancel()
+        self.preloads = {}
+
+    def _read_shard(self, email):
+        # Runs on the preload thread, only touches the file and the new store
+        shard_path = self._shard_path(email)
+        version = self._file_version(shard_path)
+        with open(shard_path, 'rb') as f:
+            user_data = self._decode_shard(f.read())
+        user_data["expenses"].date_index()
+        return version, user_data
+
+    def _preloaded_shard(self, preload, shard_path):
+        if preload is None:
+            return None
+        try:
+            version, user_data = preload.result()
+        except (OSError, ValueError):
+            return None
+        # Rewritten since it was read, e.g. by a save flushed just now or another process
+        if version != self._file_version(shard_path):
+            return None
+        return user_data
+
+    def load_all(self):
+        """Every user's full data including the password hash, used for migrations."""
+        return {
+            email: dict(self.load_user(email), password=entry["password"])
+            for email, entry in self.load_index().items()
+        }
+
+    def save_user(self, email, user_data):
+        """Queue a full snapshot of one user and fold their journal into it."""
+        journal = self._journal(email)
+        snapshot_seq = journal.last_seq
+        # Copy the columns now, the UI thread keeps appending to the live store
+        expenses = expense_store(user_data).copy()
+        profile = {key: value for key, value in user_data.items() if key not in ("expenses", "password")}
+        profile["_journal_seq"] = snapshot_seq
+        journal.entry_count = 0
+
+        def write_snapshot():
+            os.makedirs(self.data_dir, exist_ok=True)
+            with self.version_lock:
+                atomic_write(self._shard_path(email), self._encode_shard(profile, expenses))
+                journal.discard_through(snapshot_seq)
+                if os.path.exists(self._legacy_shard_path(email)):
+                    os.remove(self._legacy_shard_path(email))
+                self.user_versions[email] = self._user_version(email)
+
+        self.persister.submit(("snapshot", email), write_snapshot)
+
+    def create_user(self, email, password_hash, user_data):
+        self.save_user(email, user_data)
+        entry = self._index_entry(email, dict(user_data, password=password_hash))
+        self.index[email] = entry
+        self._write_index(self.index)
+        return entry
+
+    def record(self, email, user_data, entry):
+        journal = self._journal(email)
+        journal.append(entry)
+
+        def write_journal():
+            os.makedirs(self.data_dir, exist_ok=True)
+            with self.version_lock:
+                journal.write_pending()
+                # Only the journal is ours, an edit to the shard by someone else must still show
+                shard_version = self.user_versions.get(email, (None, None))[0]
+                self.user_versions[email] = (shard_version, self._file_version(journal.path))
+
+        self.persister.submit(("journal", email), write_journal)
+        if journal.entry_count >= config.JOURNAL_COMPACT_THRESHOLD:
+            self.save_user(email, user_data)
+
+    def close(self):
+        self.preload_executor.shutdown(wait=False, cancel_futures=True)
+        self.persister.close()
+
+    def _journal(self, email):
+        if email not in self.journals:
+            self.journals[email] = TransactionJournal(self._shard_base(email) + ".journal")
+        return self.journals[email]
+
+    def _file_version(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _user_version(self, email):
+        return self._file_version(self._shard_path(email)), self._file_version(self._journal(email).path)
+
+    def _shard_path(self, email):
+        return self._shard_base(email) + ".dat"
+
+    def _legacy_shard_path(self, email):
+        # JSON shards written before the binary format, converted on first load
+        return self._shard_base(email) + ".json"
+
+    def _shard_base(self, email):
+        return os.path.join(self.data_dir, self._shard_name(email))
+
+    def _shard_name(self, email):
+        # Readable prefix, hash suffix so distinct emails never map to the same file
+        safe_email = re.sub(r'[^A-Za-z0-9._-]', '_', email.lower())
+        return f"{safe_email}-{hashlib.sha1(email.encode()).hexdigest()[:8]}"
+
+    def _encode_shard(self, profile, expenses):
+        profile_bytes = json.dumps(profile).encode('utf-8')
+        return SHARD_HEADER.pack(SHARD_MAGIC, SHARD_VERSION, len(profile_bytes)) + profile_bytes + expenses.to_bytes()
+
+    def _decode_shard(self, data):
+        magic, version, profile_length = SHARD_HEADER.unpack_from(data)
+        if magic != SHARD_MAGIC or version != SHARD_VERSION:
+            raise ValueError("Unrecognised user data file")
+        offset = SHARD_HEADER.size
+        user_data = json.loads(data[offset:offset + profile_length].decode('utf-8'))
+        user_data["expenses"] = ExpenseStore.from_bytes(data, offset + profile_length)
+        return user_data
+
+    def _index_entry(self, email, user_data):
+        entry = {field: user_data.get(field) for field in INDEX_FIELDS}
+        entry["shard"] = self._shard_name(email)
+        return entry
+
+    def _write_index(self, index):
+        payload = json.dumps(index, indent=4)
+
+        def write_index():
+            with self.version_lock:
+                atomic_write(self.index_file, payload)
+                self.index_version = self._file_version(self.index_file)
+
+        self.persister.submit(("index",), write_index)
+
+    def _split_legacy_file(self, users):
+        """Move a single-file users.json (plus its journal) into the index and per-user shards."""
+        snapshot_seq = users.pop("_journal_seq", 0)
+        legacy_journal = TransactionJournal(self.legacy_journal_file)
+        for entry in legacy_journal.read(after_seq=snapshot_seq):
+            if entry["op"] == "user" and entry["user"] not in users:
+                users[entry["user"]] = dict(entry["profile"], expenses=[])
+            elif "shard" not in users.get(entry.get("user"), {"shard": None}):
+                apply_entry(users[entry["user"]], entry)
+
+        if os.path.exists(self.index_file):
+            shutil.copyfile(self.index_file, self.index_file + ".bak")
+
+        index = {}
+        for email, user_data in users.items():
+            if "shard" in user_data:
+                index[email] = user_data
+                continue
+            self.save_user(email, user_data)
+            index[email] = self._index_entry(email, user_data)
+
+        # Shards first, then the index, so a crash or failed write part way just repeats the split
+        self._flush_or_raise()
+        self._write_index(index)
+        self._flush_or_raise()
+        legacy_journal.truncate()
+        return index
+
+    def _flush_or_raise(self):
+        self.persister.flush()
+        error = self.persister.take_error()
+        if error is not None:
+            raise error
+
+    def expenses_between(self, email, user_data, start_date=None, end_date=None):
+        """Expenses dated within [start_date, end_date] (ISO strings, None = open), newest first."""
+        return loaded_expenses_between(user_data, start_date, end_date)
+
+    def total_between(self, email, user_data, start_date=None, end_date=None):
+        """Sum of the amounts dated within [start_date, end_date]."""
+        index = expense_store(user_data).date_index()
+        return index.total_between(iso_ordinal(start_date), iso_ordinal(end_date)) / MINOR_UNITS
+
+    def sum_by_category(self, email, user_data, start_date=None, end_date=None):
+        """[(category, total)] for expenses dated within the range, largest total first."""
+        expenses = expense_store(user_data)
+        totals = {}
+        for row in expenses.date_index().rows_between(iso_ordinal(start_date), iso_ordinal(end_date)):
+            code = expenses.category_codes[row]
+            totals[code] = totals.get(code, 0) + expenses.amounts[row]
+        return sorted(
+            ((expenses.categories[code], total / MINOR_UNITS) for code, total in totals.items()),
+            key=lambda item: item[1], reverse=True
+        )
+
+
+class SQLiteStorage:
+    """SQLite database with date and category indexes so range totals run in SQL.
+
+    The whole history is still loaded into an ExpenseStore at login: the
+    dashboard, records list and search all read that store, like with the
+    JSON backend, so callers always get the same typed Expense rows.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            email TEXT PRIMARY KEY,
+            name TEXT,
+            password TEXT,
+            created_at TEXT,
+            monthly_budget REAL,
+            currency TEXT,
+            cash_balance REAL NOT NULL DEFAULT 0.0,
+            bank_balance REAL NOT NULL DEFAULT 0.0,
+            credit_card_balance REAL NOT NULL DEFAULT 0.0
+        );
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL REFERENCES users(email),
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            account TEXT NOT NULL,
+            date TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user, date);
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_category ON expenses(user, category, date);
+    """
+
+    def __init__(self, database_file, legacy_storage=None):
+        self.connection = sqlite3.connect(database_file)
+        self.connection.row_factory = sqlite3.Row
+        # Commits are already atomic, WAL with NORMAL sync keeps each one cheap enough for the UI thread
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self.legacy_storage = legacy_storage
+        # PRAGMA data_version only moves when another connection commits
+        self.index_version = None
+        self.user_versions = {}
+
+    def load_index(self):
+        user_count = self.connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        if user_count == 0 and self.legacy_storage is not None and self.legacy_storage.exists():
+            # First run on this backend, carry the existing JSON data over
+            for email, user_data in self.legacy_storage.load_all().items():
+                self.save_user(email, user_data)
+
+        rows = self.connection.execute(f"SELECT email, {', '.join(INDEX_FIELDS)} FROM users")
+        self.index_version = self._data_version()
+        return {row["email"]: {field: row[field] for field in INDEX_FIELDS} for row in rows}
+
+    def index_changed(self):
+        return self._data_version() != self.index_version
+
+    def user_changed(self, email):
+        return self._data_version() != self.user_versions.get(email)
+
+    def _data_version(self):
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_user(self, email):
+        row = self.connection.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        user_data = {field: row[field] for field in USER_FIELDS if field != "password"}
+        # Balance columns have defaults, so rows never need the JSON backfill
+        user_data["schema_version"] = USER_SCHEMA_VERSION
+        rows = self.connection.execute(
+            "SELECT amount, category, account, date, timestamp FROM expenses WHERE user = ? ORDER BY id", (email,))
+        user_data["expenses"] = ExpenseStore.from_dicts(dict(row) for row in rows)
+        self.user_versions[email] = self._data_version()
+        return user_data
+
+    def take_write_error(self):
+        # Writes commit on the calling thread and raise there
+        return None
+
+    def preload_user(self, email):
+        # Reads go through the Tk thread's connection and are indexed, nothing to start early
+        pass
+
+    def save_user(self, email, user_data):
+        with self.connection:
+            self._upsert_user(email, user_data)
+            self.connection.execute("DELETE FROM expenses WHERE user = ?", (email,))
+            self.connection.executemany(
+                "INSERT INTO expenses (user, amount, category, account, date, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                [(email,) + tuple(exp[field] for field in EXPENSE_FIELDS) for exp in expense_store(user_data)]
+            )
+
+    def create_user(self, email, password_hash, user_data):
+        profile = dict(user_data, password=password_hash)
+        with self.connection:
+            self._upsert_user(email, profile)
+        return {field: profile.get(field) for field in INDEX_FIELDS}
+
+    def record(self, email, user_data, entry):
+        with self.connection:
+            if entry["op"] == "expense":
+                expense = entry["expense"]
+                self.connection.execute(
+                    "INSERT INTO expenses (user, amount, category, account, date, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                    (email,) + tuple(expense[field] for field in EXPENSE_FIELDS)
+                )
+                balance_field = ACCOUNT_BALANCE_FIELDS.get(expense["account"])
+                if balance_field:
+                    self.connection.execute(
+                        f"UPDATE users SET {balance_field} = {balance_field} - ? WHERE email = ?",
+                        (expense["amount"], email)
+                    )
+            elif entry["op"] == "budget":
+                self.connection.execute(
+                    "UPDATE users SET monthly_budget = ?, currency = ? WHERE email = ?",
+                    (entry["monthly_budget"], entry["currency"], email)
+                )
+
+    def close(self):
+        self.connection.close()
+        if self.legacy_storage is not None:
+            self.legacy_storage.close()
+
+    def _upsert_user(self, email, user_data):
+        # Only touch the columns present, user data loaded for the UI has no password hash
+        fields = [field for field in USER_FIELDS if field in user_data]
+        self.connection.execute(
+            f"INSERT INTO users (email, {', '.join(fields)}) VALUES (?{', ?' * len(fields)})"
+            f" ON CONFLICT(email) DO UPDATE SET {', '.join(f'{field} = excluded.{field}' for field in fields)}",
+            (email,) + tuple(user_data[field] for field in fields)
+        )
+
+    def _date_range_clause(self, start_date, end_date):
+        clause, params = "", []
+        if start_date is not None:
+            clause += " AND date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            clause += " AND date <= ?"
+            params.append(end_date)
+        return clause, params
+
+    def expenses_between(self, email, user_data, start_date=None, end_date=None):
+        return loaded_expenses_between(user_data, start_date, end_date)
+
+    def total_between(self, email, user_data, start_date=None, end_date=None):
+        clause, params = self._date_range_clause(start_date, end_date)
+        row = self.connection.execute(
+            f"SELECT COALESCE(SUM(amount), 0) FROM expenses WHERE user = ?{clause}", [email] + params).fetchone()
+        return row[0]
+
+    def sum_by_category(self, email, user_data, start_date=None, end_date=None):
+        clause, params = self._date_range_clause(start_date, end_date)
+        rows = self.connection.execute(
+            f"SELECT category, SUM(amount) AS total FROM expenses WHERE user = ?{clause}"
+            " GROUP BY category ORDER BY total DESC",
+            [email] + params
+        )
+        return [(row["category"], row["total"]) for row in rows]
+
+
+def create_storage(backend=None):
+    """Build the storage backend selected by config.STORAGE_BACKEND."""
+    backend = backend or config.STORAGE_BACKEND
+    json_storage = JsonStorage(config.USERS_FILE, config.USER_DATA_DIR, config.JOURNAL_FILE)
+    if backend == "sqlite":
+        return SQLiteStorage(config.DATABASE_FILE, legacy_storage=json_storage)
+    if backend == "json":
+        return json_storage
+    raise ValueError(f"Unknown storage backend: {backend}")
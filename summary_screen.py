@@ -1,21 +1,42 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import config
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
-import os
-from dotenv import load_dotenv
-import google.generativeai as genai
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import re
+import analytics
+import response_cache
+import ai_backend
+import insights
 
-load_dotenv()
+AI_TIMEOUT_SECONDS = 60
+AI_WORKERS = 2
+AI_POLL_MS = 100
+# Rough size of a token for budgeting prompts, Gemini averages about four characters
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+_cached_context = (None, None)
+
+
+def cached_context(version, build):
+    """build() the first time version is seen, the same context again until version changes."""
+    global _cached_context
+    if _cached_context[0] != version:
+        _cached_context = (version, build())
+    return _cached_context[1]
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
 
 class SummaryScreen:
-    def __init__(self, parent_frame, auth_manager, dashboard_instance):
+    def __init__(self, parent_frame, auth_manager, dashboard_instance, backend=None):
         self.parent_frame = parent_frame
         self.auth_manager = auth_manager
         self.dashboard = dashboard_instance
@@ -40,8 +61,18 @@ class SummaryScreen:
         # Chat history
         self.chat_history = []
         
-        # Initialize Gemini model
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # Gemini unless a backend is passed in, e.g. ai_backend.LocalBackend() to run offline
+        self.backend = backend or ai_backend.create_backend()
+        # Finished question/answer turns, the newest of them go along with each question
+        self.conversation = []
+        self.response_cache = response_cache.shared_cache()
+
+        # Requests run on worker threads, replies are picked up on the Tk thread by _poll_replies
+        self.executor = ThreadPoolExecutor(max_workers=AI_WORKERS)
+        self.pending_replies = {}
+        self.reply_count = 0
+        self.reply_history = {}
+        self.poll_job = None
         
         self.create_summary_screen()
     
@@ -140,6 +171,7 @@ class SummaryScreen:
             state=tk.DISABLED
         )
         self.chat_display.pack(fill=tk.BOTH, expand=True)
+        self.chat_display.bind("<Destroy>", self._on_destroy)
         
         # Configure tags for different message types
         self.chat_display.tag_config("user", foreground=self.PRIMARY_COLOR, font=("Segoe UI", 11, "bold"), justify=tk.RIGHT)
@@ -189,6 +221,7 @@ class SummaryScreen:
         self.message_entry.bind("<FocusIn>", self._on_entry_focus_in)
         self.message_entry.bind("<FocusOut>", self._on_entry_focus_out)
         self.message_entry.bind("<Return>", lambda e: self._send_message() if not e.state & 0x1 else None)
+        self.message_entry.bind("<Escape>", lambda e: self._cancel_replies())
         
         # Send button
         send_btn = tk.Button(
@@ -294,72 +327,209 @@ class SummaryScreen:
         # Add user message
         self._add_user_message(message)
         
-        # Show "Thinking..." indicator
-        self._add_ai_message("💭 Analyzing your expenses...")
-        self.parent_frame.update()
-        
-        # Generate AI response in background
-        try:
-            response = self._generate_ai_response(message)
-            # Remove the "Thinking..." message
-            self.chat_history.pop()
-            self._update_last_ai_message(response)
-        except Exception as e:
-            self.chat_history.pop()
-            self._update_last_ai_message(f"❌ Sorry, I encountered an error: {str(e)}\n\nPlease try again or rephrase your question.")
-    
-    def _update_last_ai_message(self, new_message):
-        """Update the last AI message in the chat display with markdown rendering"""
-        self.chat_display.config(state=tk.NORMAL)
+        # The prompt reads the user's data, so it is built here on the Tk thread
+        context, error = self._build_ai_context()
+        if error:
+            self._add_ai_message(error)
+            return
         
-        # Find and delete the last AI message
-        content = self.chat_display.get("1.0", tk.END)
-        lines = content.split('\n')
+        # Common questions are worked out from the data, only open-ended ones go to the AI
+        answer = self._local_answer(message)
+        if answer is not None:
+            self._add_ai_message(answer)
+            self._remember_turn(message, answer)
+            return
         
-        # Find the last "AI Assistant" line
-        last_ai_index = -1
-        for i in range(len(lines) - 1, -1, -1):
-            if "AI Assistant" in lines[i]:
-                last_ai_index = i
-                break
+        # Same question about the same data and model, answer from the cache without a request
+        cache_key = response_cache.cache_key(message, context, self.backend.name)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self._add_ai_message(cached)
+            self._remember_turn(message, cached)
+            return
         
-        if last_ai_index >= 0:
-            # Delete from that line to the end
-            self.chat_display.delete(f"{last_ai_index + 1}.0", tk.END)
-            
-            # Add the new message with markdown rendering
-            timestamp = datetime.now().strftime("%I:%M %p")
-            self.chat_display.insert(tk.END, "✨ AI Assistant", "ai")
-            self.chat_display.insert(tk.END, f" • {timestamp}\n", ("timestamp", "ai"))
-            
-            # Render markdown-formatted message
-            self._render_markdown(new_message)
+        # Show "Thinking..." indicator, the reply replaces it whenever it arrives
+        reply = self._add_ai_message("💭 Analyzing your expenses...", placeholder=True)
+        # The context travels as the model's system instruction, earlier turns as chat history
+        contents = self._recent_conversation() + [{"role": "user", "parts": [message]}]
+        
+        request = {
+            "cache_key": cache_key,
+            "question": message,
+            "chunks": queue.Queue(),
+            "cancelled": threading.Event(),
+            "deadline": time.monotonic() + AI_TIMEOUT_SECONDS,
+            "text": "",
+            "streamed": False,
+            "markdown": self._new_markdown_state()
+        }
+        request["future"] = self.executor.submit(
+            self._generate_ai_response, context, contents, request["chunks"], request["cancelled"])
+        self.pending_replies[reply] = request
+        if self.poll_job is None:
+            self.poll_job = self.chat_display.after(AI_POLL_MS, self._poll_replies)
+    
+    def _poll_replies(self):
+        """Show streamed text as it arrives and finish replies whose requests are done"""
+        self.poll_job = None
+        now = time.monotonic()
+        for reply, request in list(self.pending_replies.items()):
+            # Check done before draining, so nothing the worker put can be missed
+            done = request["future"].done()
+            chunks = []
+            while not request["chunks"].empty():
+                chunks.append(request["chunks"].get_nowait())
+            if chunks:
+                request["deadline"] = now + AI_TIMEOUT_SECONDS
+                self._stream_into_reply(reply, request, "".join(chunks))
             
-            self.chat_history.append({"role": "ai", "message": new_message, "timestamp": timestamp})
+            if done:
+                del self.pending_replies[reply]
+                try:
+                    if request["future"].result():
+                        self.response_cache.put(request["cache_key"], request["text"])
+                        self._remember_turn(request["question"], request["text"])
+                    self._finish_reply(reply, request)
+                except Exception as e:
+                    self._finish_reply(reply, request, f"❌ Sorry, I encountered an error: {str(e)}\n\nPlease try again or rephrase your question.")
+            elif now > request["deadline"]:
+                del self.pending_replies[reply]
+                self._stop_request(request)
+                self._finish_reply(reply, request, "⏱️ The AI service took too long to answer.\n\nPlease try again in a moment.")
+        
+        if self.pending_replies:
+            self.poll_job = self.chat_display.after(AI_POLL_MS, self._poll_replies)
+    
+    def _cancel_replies(self):
+        """Stop waiting for every pending reply"""
+        for reply, request in list(self.pending_replies.items()):
+            self._stop_request(request)
+            self._finish_reply(reply, request, "🛑 Cancelled.")
+        self.pending_replies.clear()
+    
+    def _stop_request(self, request):
+        # Queued requests never start, a running one stops reading its stream at the next chunk
+        request["future"].cancel()
+        request["cancelled"].set()
+    
+    def _on_destroy(self, event):
+        if event.widget is not self.chat_display:
+            return
+        if self.poll_job is not None:
+            self.chat_display.after_cancel(self.poll_job)
+            self.poll_job = None
+        for request in self.pending_replies.values():
+            request["cancelled"].set()
+        self.pending_replies.clear()
+        # A request already on the wire stops at its next chunk, its reply is dropped
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _stream_into_reply(self, reply, request, text):
+        """Append streamed text to a reply, completed lines as markdown and the partial last line as it is"""
+        self.chat_display.config(state=tk.NORMAL)
+        if not request["streamed"]:
+            # First text replaces the "Analyzing" placeholder
+            request["streamed"] = True
+            self.chat_display.delete(f"{reply}_start", reply)
+        else:
+            self.chat_display.delete(f"{reply}_tail", reply)
+        
+        pending = request["text"][request["text"].rfind('\n') + 1:] + text
+        request["text"] += text
+        *lines, partial = pending.split('\n')
+        
+        self.chat_display.mark_gravity(reply, tk.RIGHT)
+        for line in lines:
+            self._render_markdown_line(line, request["markdown"], reply)
+        self.chat_display.mark_set(f"{reply}_tail", reply)
+        self.chat_display.mark_gravity(f"{reply}_tail", tk.LEFT)
+        self.chat_display.insert(reply, partial)
+        self.chat_display.mark_gravity(reply, tk.LEFT)
         
         self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        self.chat_display.see(reply)
     
-    def _generate_ai_response(self, user_message):
+    def _finish_reply(self, reply, request, note=None):
+        """Render the last partial line of a reply, plus note if given, and release its marks"""
+        self.chat_display.config(state=tk.NORMAL)
+        if request is None or not request["streamed"]:
+            self.chat_display.delete(f"{reply}_start", reply)
+            message = note or ""
+            self._render_into_reply(reply, message)
+        else:
+            self.chat_display.delete(f"{reply}_tail", reply)
+            partial = request["text"][request["text"].rfind('\n') + 1:]
+            self.chat_display.mark_gravity(reply, tk.RIGHT)
+            self._render_markdown_line(partial, request["markdown"], reply)
+            if note:
+                self._render_markdown(note, reply)
+            self.chat_display.mark_gravity(reply, tk.LEFT)
+            message = request["text"] + (f"\n\n{note}" if note else "")
+        self._release_reply(reply)
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
         
+        self.reply_history.pop(reply)["message"] = message
+    
+    def _release_reply(self, reply):
+        # The marks are only needed while a reply can still change, Tk ignores the ones never set
+        self.chat_display.mark_unset(f"{reply}_start", reply, f"{reply}_tail")
+    
+    def _render_into_reply(self, reply, message):
+        # Right gravity while writing so the mark follows the text, left afterwards so later messages land after it
+        self.chat_display.mark_gravity(reply, tk.RIGHT)
+        self._render_markdown(message, reply)
+        self.chat_display.mark_gravity(reply, tk.LEFT)
+    
+    def _local_answer(self, message):
+        """Markdown answer from insights for the common questions, None for the ones that need the AI"""
+        user_data = self.auth_manager.get_current_user_data()
+        currency_symbol = self.dashboard.CURRENCY_SYMBOLS.get(user_data.get("currency", "INR"), "₹")
+        return insights.answer(message, user_data.get("expenses", []), currency_symbol, user_data.get("monthly_budget", 0))
+    
+    def _remember_turn(self, question, answer):
+        # Local answers go into the history too, so the AI can follow up on them
+        self.conversation.append({"role": "user", "parts": [question]})
+        self.conversation.append({"role": "model", "parts": [answer]})
+    
+    def _recent_conversation(self):
+        """The newest finished turns that fit in AI_HISTORY_TOKEN_BUDGET, oldest first"""
+        budget = config.AI_HISTORY_TOKEN_BUDGET
+        start = len(self.conversation)
+        while start >= 2:
+            question, answer = self.conversation[start - 2:start]
+            budget -= estimate_tokens(question["parts"][0]) + estimate_tokens(answer["parts"][0])
+            if budget < 0:
+                break
+            start -= 2
+        return self.conversation[start:]
+    
+    def _build_ai_context(self):
+        """System context describing the user's data as (context, None), or (None, error message)"""
         # Get current user's email (the logged-in user)
         current_user_email = self.auth_manager.current_user
         
         if not current_user_email:
-            return "❌ Error: No user is currently logged in. Please log in to access your expense data."
+            return None, "❌ Error: No user is currently logged in. Please log in to access your expense data."
         
         # Get user data for the logged-in user only
         user_data = self.auth_manager.get_current_user_data()
         if not user_data:
-            return f"❌ Error: Could not retrieve data for user {current_user_email}. Please make sure you're logged in."
+            return None, f"❌ Error: Could not retrieve data for user {current_user_email}. Please make sure you're logged in."
         
         # Extract user's expense data
         expenses = user_data.get("expenses", [])
-        currency_code = user_data.get("currency", "USD")
-        currency_symbol = self.dashboard.CURRENCY_SYMBOLS.get(currency_code, "$")
+        currency_code = user_data.get("currency", "INR")
+        currency_symbol = self.dashboard.CURRENCY_SYMBOLS.get(currency_code, "₹")
         monthly_budget = user_data.get("monthly_budget", 0)
         user_name = user_data.get("name", "User")
         
+        # The context only changes with the data, so it is built once per version of it
+        version = (current_user_email, expenses, len(expenses), currency_code, monthly_budget, user_name, date.today())
+        return cached_context(version, lambda: self._format_ai_context(
+            current_user_email, user_name, expenses, currency_code, currency_symbol, monthly_budget)), None
+    
+    def _format_ai_context(self, current_user_email, user_name, expenses, currency_code, currency_symbol, monthly_budget):
         # Prepare expense data summary for AI
         expense_summary = self._prepare_expense_data_for_ai(expenses, currency_code, currency_symbol, monthly_budget)
         
@@ -409,183 +579,170 @@ IMPORTANT - Formatting Instructions:
   1. Try meal prepping to reduce food costs
   2. Consider carpooling for transport savings
 """
-
-        user_prompt = f"User Question: {user_message}"
         
-        # Generate response using Gemini
+        return system_context
+    
+    def _generate_ai_response(self, context, contents, chunks, cancelled):
+        """Stream the backend's reply into the chunks queue, True if the whole reply arrived
+
+        Runs on a worker thread, so it must not touch any widget.
+        """
+        streamed = False
         try:
-            # Create chat instance
-            chat = self.model.start_chat(history=[])
-            
-            # Send the context and user question
-            full_prompt = f"{system_context}\n\n{user_prompt}"
-            response = chat.send_message(full_prompt)
-            
-            return response.text
-            
+            # Send the earlier turns and the user question along with the context
+            for text in self.backend.stream(context, contents, AI_TIMEOUT_SECONDS):
+                if cancelled.is_set():
+                    return False
+                chunks.put(text)
+                streamed = True
+            return True
+        
         except Exception as e:
-            # Fallback to basic response if API fails
-            return f"⚠️ I'm having trouble connecting to the AI service right now.\n\nError: {str(e)}\n\nPlease check your internet connection and try again."
+            # Fallback to basic response if API fails, after whatever part of the reply already arrived
+            chunks.put(("\n\n" if streamed else "") + f"⚠️ I'm having trouble connecting to the AI service right now.\n\nError: {str(e)}\n\nPlease check your internet connection and try again.")
+            return False
     
     def _prepare_expense_data_for_ai(self, expenses, currency_code, currency_symbol, monthly_budget):
-        """Prepare expense data in a format suitable for AI analysis"""
+        """Prepare expense data in a format suitable for AI analysis, within AI_CONTEXT_TOKEN_BUDGET"""
         if not expenses:
             return "Transaction Data: No expenses recorded yet."
         
-        # Calculate various statistics
-        total_expenses = sum(float(exp.get("amount", 0)) for exp in expenses)
-        transaction_count = len(expenses)
-        
-        # Category breakdown
-        categories = {}
-        for exp in expenses:
-            cat = exp.get("category", "Unknown")
-            amount = float(exp.get("amount", 0))
-            categories[cat] = categories.get(cat, 0) + amount
-        
-        # Account breakdown
-        accounts = {}
-        for exp in expenses:
-            acc = exp.get("account", "Unknown")
-            amount = float(exp.get("amount", 0))
-            accounts[acc] = accounts.get(acc, 0) + amount
-        
-        # Time-based analysis
-        now = datetime.now()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        weekly_expenses = []
-        monthly_expenses = []
-        
-        for exp in expenses:
-            try:
-                exp_date = datetime.fromisoformat(exp.get("timestamp", exp.get("date", "")))
-                if exp_date >= week_ago:
-                    weekly_expenses.append(exp)
-                if exp_date >= month_ago:
-                    monthly_expenses.append(exp)
-            except:
-                continue
-        
-        weekly_total = sum(float(exp.get("amount", 0)) for exp in weekly_expenses)
-        monthly_total = sum(float(exp.get("amount", 0)) for exp in monthly_expenses)
-        
-        # Recent transactions (last 5)
-        sorted_expenses = sorted(expenses, key=lambda x: x.get("timestamp", x.get("date", "")), reverse=True)
-        recent_5 = sorted_expenses[:5]
-        
-        # Format the data summary
-        summary = f"""Transaction Data Summary:
+        # Vectorized over the expense columns instead of one loop per statistic
+        frame = analytics.frame_for(expenses)
+        total_expenses = frame.total()
+        transaction_count = len(frame)
+        categories = frame.sum_by_category()
+        accounts = frame.sum_by_account()
+        
+        # Calendar days like the dashboard, so the summary holds for the whole day it is cached for
+        today = date.today()
+        weekly_mask = frame.mask_between(today - timedelta(days=6), today)
+        monthly_mask = frame.mask_between(today - timedelta(days=29), today)
+        weekly_total = frame.total(weekly_mask)
+        monthly_total = frame.total(monthly_mask)
+        weekly_count = frame.count(weekly_mask)
+        monthly_count = frame.count(monthly_mask)
+        
+        recent = [expenses[row] for row in frame.recent_rows(5)]
+        
+        # Users with many categories or accounts get the largest few, the rest summed into one line
+        for limit in (None, 10, 5, 3):
+            summary = f"""Transaction Data Summary:
 
 Overall Statistics:
 - Total Transactions: {transaction_count}
 - Total Spent (All Time): {currency_symbol}{total_expenses:,.2f}
-- Last 7 Days: {currency_symbol}{weekly_total:,.2f} ({len(weekly_expenses)} transactions)
-- Last 30 Days: {currency_symbol}{monthly_total:,.2f} ({len(monthly_expenses)} transactions)
+- Last 7 Days: {currency_symbol}{weekly_total:,.2f} ({weekly_count} transactions)
+- Last 30 Days: {currency_symbol}{monthly_total:,.2f} ({monthly_count} transactions)
 
 Category Breakdown:"""
+            summary += self._format_breakdown(categories, total_expenses, currency_symbol, limit, "categories")
+            
+            summary += f"\n\nAccount Breakdown:"
+            summary += self._format_breakdown(accounts, total_expenses, currency_symbol, limit, "accounts")
+            
+            shown_recent = recent[:limit or len(recent)]
+            summary += f"\n\nRecent Transactions (Last {len(shown_recent)}):"
+            for i, exp in enumerate(shown_recent, 1):
+                summary += f"\n{i}. {currency_symbol}{exp.amount:,.2f} - {exp.category} - {exp.date.isoformat()} ({exp.account})"
+            
+            if monthly_budget > 0:
+                remaining = monthly_budget - monthly_total
+                percentage_used = (monthly_total / monthly_budget * 100) if monthly_budget > 0 else 0
+                summary += f"\n\nBudget Status (30 days):"
+                summary += f"\n- Budget: {currency_symbol}{monthly_budget:,.2f}"
+                summary += f"\n- Spent: {currency_symbol}{monthly_total:,.2f} ({percentage_used:.1f}%)"
+                summary += f"\n- Remaining: {currency_symbol}{remaining:,.2f}"
+            
+            if estimate_tokens(summary) <= config.AI_CONTEXT_TOKEN_BUDGET:
+                break
         
-        for cat, amount in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        return summary
+    
+    def _format_breakdown(self, totals, total_expenses, currency_symbol, limit, noun):
+        """Breakdown lines for the largest `limit` of (name, amount) totals plus one line for the rest"""
+        shown = totals if limit is None else totals[:limit]
+        lines = ""
+        for name, amount in shown:
             percentage = (amount / total_expenses * 100) if total_expenses > 0 else 0
-            summary += f"\n- {cat}: {currency_symbol}{amount:,.2f} ({percentage:.1f}%)"
-        
-        summary += f"\n\nAccount Breakdown:"
-        for acc, amount in sorted(accounts.items(), key=lambda x: x[1], reverse=True):
+            lines += f"\n- {name}: {currency_symbol}{amount:,.2f} ({percentage:.1f}%)"
+        rest = totals[len(shown):]
+        if rest:
+            amount = sum(amount for _, amount in rest)
             percentage = (amount / total_expenses * 100) if total_expenses > 0 else 0
-            summary += f"\n- {acc}: {currency_symbol}{amount:,.2f} ({percentage:.1f}%)"
-        
-        summary += f"\n\nRecent Transactions (Last 5):"
-        for i, exp in enumerate(recent_5, 1):
-            amount = float(exp.get("amount", 0))
-            category = exp.get("category", "Unknown")
-            date = exp.get("date", "Unknown")
-            account = exp.get("account", "Unknown")
-            summary += f"\n{i}. {currency_symbol}{amount:,.2f} - {category} - {date} ({account})"
-        
-        if monthly_budget > 0:
-            remaining = monthly_budget - monthly_total
-            percentage_used = (monthly_total / monthly_budget * 100) if monthly_budget > 0 else 0
-            summary += f"\n\nBudget Status (30 days):"
-            summary += f"\n- Budget: {currency_symbol}{monthly_budget:,.2f}"
-            summary += f"\n- Spent: {currency_symbol}{monthly_total:,.2f} ({percentage_used:.1f}%)"
-            summary += f"\n- Remaining: {currency_symbol}{remaining:,.2f}"
-        
-        return summary
+            lines += f"\n- {len(rest)} other {noun}: {currency_symbol}{amount:,.2f} ({percentage:.1f}%)"
+        return lines
     
-    def _render_markdown(self, text):
+    def _render_markdown(self, text, index=tk.END):
         """Render markdown-formatted text to the chat display with proper formatting"""
-        # Split text into lines for processing
-        lines = text.split('\n')
-        i = 0
-        in_code_block = False
-        code_block_content = []
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # Handle code blocks (```)
-            if line.strip().startswith('```'):
-                if not in_code_block:
-                    in_code_block = True
-                    code_block_content = []
-                else:
-                    # End of code block
-                    in_code_block = False
-                    if code_block_content:
-                        self.chat_display.insert(tk.END, '\n'.join(code_block_content) + '\n', "code_block")
-                    code_block_content = []
-                i += 1
-                continue
-            
-            if in_code_block:
-                code_block_content.append(line)
-                i += 1
-                continue
-            
-            # Handle headings
-            if line.startswith('### '):
-                self.chat_display.insert(tk.END, line[4:] + '\n', "heading3")
-            elif line.startswith('## '):
-                self.chat_display.insert(tk.END, line[3:] + '\n', "heading2")
-            elif line.startswith('# '):
-                self.chat_display.insert(tk.END, line[2:] + '\n', "heading1")
-            
-            # Handle bullet points
-            elif line.strip().startswith('- ') or line.strip().startswith('• '):
-                bullet_text = line.strip()[2:]
-                formatted_text = self._format_inline_markdown(bullet_text)
-                self.chat_display.insert(tk.END, '• ', "bullet")
-                self._insert_formatted_text(formatted_text, "bullet")
-                self.chat_display.insert(tk.END, '\n')
-            
-            # Handle numbered lists
-            elif re.match(r'^\d+\.\s', line.strip()):
-                match = re.match(r'^(\d+)\.\s(.+)', line.strip())
-                if match:
-                    num, text = match.groups()
-                    formatted_text = self._format_inline_markdown(text)
-                    self.chat_display.insert(tk.END, f'{num}. ', "number")
-                    self._insert_formatted_text(formatted_text, "number")
-                    self.chat_display.insert(tk.END, '\n')
-            
-            # Handle blockquotes
-            elif line.strip().startswith('> '):
-                quote_text = line.strip()[2:]
-                self.chat_display.insert(tk.END, quote_text + '\n', "blockquote")
-            
-            # Handle horizontal rules
-            elif line.strip() in ['---', '***', '___']:
-                self.chat_display.insert(tk.END, '─' * 50 + '\n')
-            
-            # Handle regular text with inline formatting
+        state = self._new_markdown_state()
+        for line in text.split('\n'):
+            self._render_markdown_line(line, state, index)
+    
+    def _new_markdown_state(self):
+        """What _render_markdown_line carries from one line to the next"""
+        return {"in_code_block": False, "code_block_content": []}
+    
+    def _render_markdown_line(self, line, state, index=tk.END):
+        """Render one complete line of markdown, code blocks are buffered in state until they close"""
+        # Handle code blocks (```)
+        if line.strip().startswith('```'):
+            if not state["in_code_block"]:
+                state["in_code_block"] = True
+                state["code_block_content"] = []
             else:
-                if line.strip():  # Only process non-empty lines
-                    formatted_text = self._format_inline_markdown(line)
-                    self._insert_formatted_text(formatted_text)
-                self.chat_display.insert(tk.END, '\n')
-            
-            i += 1
+                # End of code block
+                state["in_code_block"] = False
+                if state["code_block_content"]:
+                    self.chat_display.insert(index, '\n'.join(state["code_block_content"]) + '\n', "code_block")
+                state["code_block_content"] = []
+            return
+        
+        if state["in_code_block"]:
+            state["code_block_content"].append(line)
+            return
+        
+        # Handle headings
+        if line.startswith('### '):
+            self.chat_display.insert(index, line[4:] + '\n', "heading3")
+        elif line.startswith('## '):
+            self.chat_display.insert(index, line[3:] + '\n', "heading2")
+        elif line.startswith('# '):
+            self.chat_display.insert(index, line[2:] + '\n', "heading1")
+        
+        # Handle bullet points
+        elif line.strip().startswith('- ') or line.strip().startswith('• '):
+            bullet_text = line.strip()[2:]
+            formatted_text = self._format_inline_markdown(bullet_text)
+            self.chat_display.insert(index, '• ', "bullet")
+            self._insert_formatted_text(formatted_text, "bullet", index)
+            self.chat_display.insert(index, '\n')
+        
+        # Handle numbered lists
+        elif re.match(r'^\d+\.\s', line.strip()):
+            match = re.match(r'^(\d+)\.\s(.+)', line.strip())
+            if match:
+                num, text = match.groups()
+                formatted_text = self._format_inline_markdown(text)
+                self.chat_display.insert(index, f'{num}. ', "number")
+                self._insert_formatted_text(formatted_text, "number", index)
+                self.chat_display.insert(index, '\n')
+        
+        # Handle blockquotes
+        elif line.strip().startswith('> '):
+            quote_text = line.strip()[2:]
+            self.chat_display.insert(index, quote_text + '\n', "blockquote")
+        
+        # Handle horizontal rules
+        elif line.strip() in ['---', '***', '___']:
+            self.chat_display.insert(index, '─' * 50 + '\n')
+        
+        # Handle regular text with inline formatting
+        else:
+            if line.strip():  # Only process non-empty lines
+                formatted_text = self._format_inline_markdown(line)
+                self._insert_formatted_text(formatted_text, None, index)
+            self.chat_display.insert(index, '\n')
     
     def _format_inline_markdown(self, text):
         """Parse inline markdown formatting and return formatted segments"""
@@ -660,19 +817,19 @@ Category Breakdown:"""
         
         return segments
     
-    def _insert_formatted_text(self, segments, base_tag=None):
+    def _insert_formatted_text(self, segments, base_tag=None, index=tk.END):
         """Insert formatted text segments into the chat display"""
         for format_type, text in segments:
             if format_type == 'bold':
-                self.chat_display.insert(tk.END, text, ("bold", base_tag) if base_tag else "bold")
+                self.chat_display.insert(index, text, ("bold", base_tag) if base_tag else "bold")
             elif format_type == 'italic':
-                self.chat_display.insert(tk.END, text, ("italic", base_tag) if base_tag else "italic")
+                self.chat_display.insert(index, text, ("italic", base_tag) if base_tag else "italic")
             elif format_type == 'code':
-                self.chat_display.insert(tk.END, text, ("code", base_tag) if base_tag else "code")
+                self.chat_display.insert(index, text, ("code", base_tag) if base_tag else "code")
             elif format_type == 'link':
-                self.chat_display.insert(tk.END, text, ("link", base_tag) if base_tag else "link")
+                self.chat_display.insert(index, text, ("link", base_tag) if base_tag else "link")
             else:
-                self.chat_display.insert(tk.END, text, base_tag)
+                self.chat_display.insert(index, text, base_tag)
     
     def _add_user_message(self, message):
         """Add user message to chat display aligned to the right with pink background"""
@@ -693,8 +850,12 @@ Category Breakdown:"""
         
         self.chat_history.append({"role": "user", "message": message, "timestamp": timestamp})
     
-    def _add_ai_message(self, message):
-        """Add AI message to chat display with markdown rendering aligned to the left"""
+    def _add_ai_message(self, message, placeholder=False):
+        """Add AI message to chat display with markdown rendering aligned to the left
+
+        A placeholder keeps the mark pair around its body and returns its
+        name, which _finish_reply() uses to replace it in place.
+        """
         self.chat_display.config(state=tk.NORMAL)
         
         timestamp = datetime.now().strftime("%I:%M %p")
@@ -703,13 +864,25 @@ Category Breakdown:"""
         self.chat_display.insert(tk.END, "✨ AI Assistant", "ai")
         self.chat_display.insert(tk.END, f" • {timestamp}\n", ("timestamp", "ai"))
         
+        self.reply_count += 1
+        reply = f"reply{self.reply_count}"
+        self.chat_display.mark_set(f"{reply}_start", "end-1c")
+        self.chat_display.mark_gravity(f"{reply}_start", tk.LEFT)
+        self.chat_display.mark_set(reply, "end-1c")
+        
         # Render markdown-formatted message
-        self._render_markdown(message)
+        self._render_into_reply(reply, message)
         
         self.chat_display.config(state=tk.DISABLED)
         self.chat_display.see(tk.END)
         
-        self.chat_history.append({"role": "ai", "message": message, "timestamp": timestamp})
+        entry = {"role": "ai", "message": message, "timestamp": timestamp}
+        self.chat_history.append(entry)
+        if not placeholder:
+            self._release_reply(reply)
+            return None
+        self.reply_history[reply] = entry
+        return reply
 
 
 def display_summary_screen(root, auth_manager, dashboard_instance):
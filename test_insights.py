@@ -0,0 +1,55 @@
+import unittest
+from datetime import date
+import insights
+from expense_store import ExpenseStore
+
+
+def store_of(*expenses):
+    return ExpenseStore.from_dicts(
+        {"amount": amount, "category": category, "account": "CASH",
+         "date": day, "timestamp": f"{day}T12:00:00"}
+        for amount, category, day in expenses
+    )
+
+
+class QuestionIntentTest(unittest.TestCase):
+    def test_suggestion_cards(self):
+        self.assertEqual(insights.question_intent("Summarize my expenses from the last week"), "week")
+        self.assertEqual(insights.question_intent("Give me a monthly overview of my spending"), "month")
+        self.assertIsNone(insights.question_intent("What areas can I improve to save more money?"))
+        self.assertIsNone(insights.question_intent("Analyze my spending trends and patterns"))
+
+    def test_common_questions(self):
+        self.assertEqual(insights.question_intent("Am I over budget?"), "budget")
+        self.assertEqual(insights.question_intent("How much budget do I have left?"), "budget")
+        self.assertEqual(insights.question_intent("What are my top categories?"), "categories")
+        self.assertEqual(insights.question_intent("How much did I spend this week?"), "week")
+
+    def test_qualified_questions_go_to_the_ai(self):
+        self.assertIsNone(insights.question_intent("What did I spend on food this month?"))
+        self.assertIsNone(insights.question_intent("Did I exceed my budget on transport?"))
+        self.assertIsNone(insights.question_intent("Top categories this week vs last month?"))
+        self.assertIsNone(insights.question_intent("Top categories this week?"))
+        self.assertIsNone(insights.question_intent("What did I spend last month?"))
+        self.assertIsNone(insights.question_intent("How can I cut my weekly spending?"))
+
+
+class AnswerTest(unittest.TestCase):
+    def test_budget(self):
+        expenses = store_of((300, "Food", "2026-10-02"), (50, "Travel", "2026-09-30"))
+        reply = insights.answer("Am I over budget?", expenses, "₹", 200, today=date(2026, 10, 10))
+        self.assertIn("**Spent This Month**: ₹300.00 (150.0%)", reply)
+        self.assertIn("**Over budget** by ₹100.00", reply)
+
+    def test_week_only_counts_the_last_seven_days(self):
+        expenses = store_of((10, "Food", "2026-10-10"), (20, "Food", "2026-10-04"), (40, "Rent", "2026-10-03"))
+        reply = insights.answer("Weekly summary", expenses, "₹", 0, today=date(2026, 10, 10))
+        self.assertIn("**Total Spent**: ₹30.00 across 2 transactions", reply)
+
+    def test_open_questions_are_left_to_the_ai(self):
+        expenses = store_of((10, "Food", "2026-10-10"))
+        self.assertIsNone(insights.answer("What did I spend on food this month?", expenses, "₹", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+from journal import TransactionJournal
+
+
+class TransactionJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "user.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, *ops):
+        journal = TransactionJournal(self.path)
+        journal.read()
+        for op in ops:
+            journal.append({"op": op})
+        journal.write_pending()
+        return journal
+
+    def test_entries_after_the_snapshot(self):
+        self.write("a", "b", "c")
+        journal = TransactionJournal(self.path)
+        self.assertEqual([entry["op"] for entry in journal.read(after_seq=1)], ["b", "c"])
+        self.assertEqual((journal.last_seq, journal.entry_count), (3, 2))
+
+    def test_torn_last_line(self):
+        self.write("a", "b")
+        with open(self.path, 'a') as f:
+            f.write('{"op": "c", "se')
+
+        journal = TransactionJournal(self.path)
+        self.assertEqual([entry["op"] for entry in journal.read()], ["a", "b"])
+        # The next append starts on a line of its own
+        journal.append({"op": "d"})
+        journal.write_pending()
+        self.assertEqual([entry["op"] for entry in TransactionJournal(self.path).read()], ["a", "b", "d"])
+
+    def test_discard_through_keeps_newer_entries(self):
+        journal = self.write("a", "b", "c")
+        journal.discard_through(2)
+        self.assertEqual([entry["seq"] for entry in TransactionJournal(self.path).read()], [3])
+        journal.discard_through(3)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+import response_cache
+from response_cache import ResponseCache
+
+QUESTION = "What areas can I improve to save more money?"
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_same_suggestion_same_key(self):
+        first = response_cache.cache_key(QUESTION, "context", "gemini")
+        self.assertEqual(response_cache.cache_key(QUESTION, "context", "gemini"), first)
+        self.assertEqual(response_cache.cache_key("what areas can i improve to save more money", "context", "gemini"), first)
+
+    def test_new_data_or_model_misses(self):
+        first = response_cache.cache_key(QUESTION, "context", "gemini")
+        self.assertNotEqual(response_cache.cache_key(QUESTION, "new expense added", "gemini"), first)
+        self.assertNotEqual(response_cache.cache_key(QUESTION, "context", "local"), first)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "ai_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_asking_a_suggestion_twice_hits(self):
+        cache = ResponseCache(self.path)
+        key = response_cache.cache_key(QUESTION, "context", "gemini")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "Spend less on food.")
+
+        self.assertEqual(cache.get(response_cache.cache_key(QUESTION, "context", "gemini")), "Spend less on food.")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+        # And again after a restart
+        self.assertEqual(ResponseCache(self.path).get(key), "Spend less on food.")
+
+    def test_oldest_used_entry_goes_first(self):
+        cache = ResponseCache(self.path, max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
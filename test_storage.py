@@ -0,0 +1,182 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import config
+from journal import TransactionJournal
+from storage import JsonStorage, SQLiteStorage, apply_expense
+
+EMAIL = "a@example.com"
+
+
+def expense_entry(amount, day):
+    return {"op": "expense", "expense": {"amount": amount, "category": "Food", "account": "CASH",
+                                         "date": day, "timestamp": f"{day}T12:00:00"}}
+
+
+class JsonStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_file = os.path.join(self.directory, "users.json")
+        self.legacy_journal_file = os.path.join(self.directory, "users.journal")
+        self.storages = []
+
+    def tearDown(self):
+        for storage in self.storages:
+            storage.close()
+        shutil.rmtree(self.directory)
+
+    def open_storage(self):
+        storage = JsonStorage(self.index_file, os.path.join(self.directory, "user_data"), self.legacy_journal_file)
+        self.storages.append(storage)
+        return storage
+
+    def new_user(self, storage):
+        user_data = {"name": "A", "monthly_budget": 100.0, "currency": "INR", "cash_balance": 0.0, "expenses": []}
+        storage.create_user(EMAIL, "hash", user_data)
+        return user_data
+
+    def record(self, storage, user_data, *amounts):
+        # Like AuthManager.add_expense(), the change is applied before it is recorded
+        for amount in amounts:
+            entry = expense_entry(amount, "2026-10-01")
+            apply_expense(user_data, entry["expense"])
+            storage.record(EMAIL, user_data, entry)
+
+    def shard_exists(self, storage):
+        return os.path.exists(storage._shard_path(EMAIL))
+
+    def journal_exists(self, storage):
+        return os.path.exists(storage._journal(EMAIL).path)
+
+
+class ShardTest(JsonStorageTestCase):
+    def test_round_trip(self):
+        storage = self.open_storage()
+        user_data = self.new_user(storage)
+        self.record(storage, user_data, 12.5, 7.25)
+        storage.save_user(EMAIL, user_data)
+        storage.persister.flush()
+        self.assertFalse(self.journal_exists(storage))
+
+        loaded = self.open_storage().load_user(EMAIL)
+        self.assertEqual(loaded["name"], "A")
+        self.assertEqual(loaded["monthly_budget"], 100.0)
+        self.assertNotIn("_journal_seq", loaded)
+        self.assertEqual([expense.to_dict() for expense in loaded["expenses"]],
+                         [expense.to_dict() for expense in user_data["expenses"]])
+
+    def test_replay_after_crash_before_the_journal_was_trimmed(self):
+        storage = self.open_storage()
+        user_data = self.new_user(storage)
+        self.record(storage, user_data, 1, 2)
+        storage.persister.flush()
+        # The snapshot lands but the process dies before the journal is trimmed
+        with mock.patch.object(TransactionJournal, "discard_through"):
+            storage.save_user(EMAIL, user_data)
+            storage.persister.flush()
+        self.assertTrue(self.journal_exists(storage))
+
+        loaded = self.open_storage().load_user(EMAIL)
+        self.assertEqual([expense.amount for expense in loaded["expenses"]], [1, 2])
+
+    def test_journal_replayed_on_top_of_the_snapshot(self):
+        storage = self.open_storage()
+        user_data = self.new_user(storage)
+        self.record(storage, user_data, 1)
+        storage.save_user(EMAIL, user_data)
+        self.record(storage, user_data, 2, 3)
+        storage.persister.flush()
+
+        loaded = self.open_storage().load_user(EMAIL)
+        self.assertEqual([expense.amount for expense in loaded["expenses"]], [1, 2, 3])
+        self.assertEqual(loaded["cash_balance"], -6)
+
+    def test_compaction(self):
+        storage = self.open_storage()
+        user_data = self.new_user(storage)
+        with mock.patch.object(config, "JOURNAL_COMPACT_THRESHOLD", 3):
+            self.record(storage, user_data, 1, 2)
+            storage.persister.flush()
+            self.assertTrue(self.journal_exists(storage))
+            self.record(storage, user_data, 3)
+            storage.persister.flush()
+        self.assertFalse(self.journal_exists(storage))
+
+        loaded = self.open_storage().load_user(EMAIL)
+        self.assertEqual([expense.amount for expense in loaded["expenses"]], [1, 2, 3])
+
+
+class LegacySplitTest(JsonStorageTestCase):
+    def test_split(self):
+        with open(self.index_file, 'w') as f:
+            json.dump({"_journal_seq": 1, EMAIL: {
+                "name": "A", "password": "hash", "monthly_budget": 100.0, "currency": "INR", "cash_balance": 0.0,
+                "expenses": [expense_entry(1, "2026-10-01")["expense"]]
+            }}, f)
+        legacy_journal = TransactionJournal(self.legacy_journal_file)
+        # The first entry is already in users.json, only the second is replayed
+        for amount in (1, 2):
+            legacy_journal.append(dict(expense_entry(amount, "2026-10-02"), user=EMAIL))
+        legacy_journal.write_pending()
+
+        index = self.open_storage().load_index()
+        self.assertEqual(index, {EMAIL: {"name": "A", "password": "hash", "created_at": None,
+                                         "shard": index[EMAIL]["shard"]}})
+        self.assertTrue(os.path.exists(self.index_file + ".bak"))
+        self.assertFalse(os.path.exists(self.legacy_journal_file))
+
+        storage = self.open_storage()
+        self.assertEqual(storage.load_index(), index)
+        loaded = storage.load_user(EMAIL)
+        self.assertNotIn("password", loaded)
+        self.assertEqual([(expense.amount, expense.date.isoformat()) for expense in loaded["expenses"]],
+                         [(1, "2026-10-01"), (2, "2026-10-02")])
+        self.assertEqual(loaded["cash_balance"], -2)
+
+    def test_expense_without_account(self):
+        with open(self.index_file, 'w') as f:
+            json.dump({"a@example.com": {
+                "name": "A", "password": "hash", "monthly_budget": 100.0, "currency": "INR",
+                "expenses": [{"amount": 12.5, "category": "Food", "date": "2026-10-01"}]
+            }}, f)
+
+        index = self.open_storage().load_index()
+        self.assertIn("shard", index["a@example.com"])
+
+        expenses = self.open_storage().load_user("a@example.com")["expenses"]
+        self.assertEqual(len(expenses), 1)
+        self.assertEqual(expenses[0].account, "Cash")
+        self.assertEqual(expenses[0].amount, 12.5)
+
+
+class SumByCategoryTest(JsonStorageTestCase):
+    EXPENSES = [
+        {"amount": 10.0, "category": "Food", "account": "CASH", "date": "2026-10-01", "timestamp": "2026-10-01T09:00:00"},
+        {"amount": 30.0, "category": "Rent", "account": "BANK", "date": "2026-10-02", "timestamp": "2026-10-02T09:00:00"},
+        {"amount": 5.5, "category": "Food", "account": "CASH", "date": "2026-10-03", "timestamp": "2026-10-03T09:00:00"},
+        {"amount": 99.0, "category": "Travel", "account": "CASH", "date": "2026-09-01", "timestamp": "2026-09-01T09:00:00"}
+    ]
+
+    def check(self, storage):
+        user_data = {"name": "A", "password": "hash", "expenses": [dict(expense) for expense in self.EXPENSES]}
+        storage.save_user("a@example.com", user_data)
+        user_data = storage.load_user("a@example.com")
+        self.assertEqual(storage.sum_by_category("a@example.com", user_data, "2026-10-01", "2026-10-31"),
+                         [("Rent", 30.0), ("Food", 15.5)])
+        self.assertEqual(storage.sum_by_category("a@example.com", user_data, None, "2026-10-01"),
+                         [("Travel", 99.0), ("Food", 10.0)])
+
+    def test_json(self):
+        self.check(self.open_storage())
+
+    def test_sqlite(self):
+        storage = SQLiteStorage(os.path.join(self.directory, "expenses.db"))
+        self.storages.append(storage)
+        self.check(storage)
+
+
+if __name__ == "__main__":
+    unittest.main()
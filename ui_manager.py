@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import messagebox
 import config
 import onboarding_screen 
-import user_dashboard 
+import prewarm
 
 class UIManager:
     def __init__(self, root, auth_manager, app_instance):
@@ -26,6 +26,8 @@ class UIManager:
             widget.destroy()
 
     def show_login_screen(self):
+        # While the user types, load what the dashboard will need once they are in
+        prewarm.start()
         self.clear_frame()
         
         main_frame = tk.Frame(self.root, bg=self.BG_LIGHT)
@@ -124,6 +126,7 @@ class UIManager:
         )
         email_entry.pack(fill=tk.X, ipady=12, pady=(0, 15))
         email_entry.insert(0, "")
+        email_entry.bind("<FocusOut>", lambda e: self.auth_manager.preload_user(email_entry.get()))
         
         email_border = tk.Frame(form_container, bg="#e2e8f0", height=1)
         email_border.pack(fill=tk.X, pady=(0, 15))
@@ -523,6 +526,8 @@ class UIManager:
         )
 
     def show_dashboard(self):
+        # Imported on first use, the dashboard pulls in matplotlib, which the login screen never needs
+        import user_dashboard
         self.clear_frame()
         
         dashboard_instance = user_dashboard.UserDashboard(self.root, self.auth_manager, self.app_instance)
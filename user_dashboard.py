@@ -1,17 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.patches import Wedge
+from matplotlib.patches import Circle, Wedge
 import config
 from tkinter import messagebox
-from datetime import datetime, timedelta
 import math
-import add_expenses 
-import records_screen 
-from all_transactions_screen import display_all_transactions_screen
 from onboarding_screen import display_onboarding_screen
-from summary_screen import display_summary_screen
+from transaction_sort import TransactionSorter
+
+SEARCH_DELAY_MS = 250
+SEARCH_RESULT_LIMIT = 200
 
 class UserDashboard:
     def __init__(self, root, auth_manager, app_instance):
@@ -67,26 +66,19 @@ class UserDashboard:
         self.dark_mode_enabled = tk.BooleanVar(value=False)
         self.hide_amounts_enabled = tk.BooleanVar(value=False)
 
-    def _calculate_expense_summary(self, expenses, days=30):
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days - 1)
-
-        summary_filtered_expenses = [exp for exp in expenses if start_date <= datetime.fromisoformat(exp['date']) <= end_date]
-
-        total_spent = sum(item['amount'] for item in summary_filtered_expenses)
-        
-        category_breakdown = {}
-        for item in summary_filtered_expenses:
-            category = item['category'].capitalize() # Ensure consistent capitalization
-            category_breakdown[category] = category_breakdown.get(category, 0) + item['amount']
-
-        # Sort categories by amount spent for consistent display
-        sorted_categories = sorted(category_breakdown.items(), key=lambda item: item[1], reverse=True)
+        # One Figure per chart for the life of the dashboard, plain Figures so pyplot never tracks them
+        self.trend_figure = None
+        self.trend_canvas = None
+        self.pie_figure = None
+        self.pie_canvas = None
 
-        all_expenses_sorted_by_timestamp = sorted(expenses, key=lambda x: datetime.fromisoformat(x['timestamp']), reverse=True)
-        recent_transactions = all_expenses_sorted_by_timestamp[:6]
+        # Each card registers a function that refreshes its contents in place when the data changes
+        self.card_updaters = []
+        self.dashboard_container = None
 
-        return total_spent, sorted_categories, recent_transactions
+        # Expense records behind the transactions table, sorted by their typed fields
+        self.transaction_sorter = TransactionSorter()
+        self.search_job = None
 
     def toggle_hide_amounts(self):
         self.hide_amounts_enabled.set(not self.hide_amounts_enabled.get())
@@ -100,8 +92,22 @@ class UserDashboard:
             widget.destroy()
 
     def show_add_transaction_modal(self):
+        # Screens are imported on first visit, so the dashboard never waits on tkcalendar, reportlab or the AI client
+        import add_expenses
         add_expenses.display_add_expense_screen(self.root, self.auth_manager, self)
 
+    def show_records_screen(self):
+        import records_screen
+        records_screen.display_records_screen(self.root, self.auth_manager, self)
+
+    def show_all_transactions_screen(self):
+        from all_transactions_screen import display_all_transactions_screen
+        display_all_transactions_screen(self.root, self.auth_manager, self)
+
+    def show_summary_screen(self):
+        from summary_screen import display_summary_screen
+        display_summary_screen(self.root, self.auth_manager, self)
+
     def show_add_income_modal(self):
         from tkinter import messagebox
         messagebox.showinfo("Coming Soon", "Add Income feature will be implemented soon!")
@@ -187,8 +193,6 @@ class UserDashboard:
             if success:
                 messagebox.showinfo("Success", msg)
                 modal.destroy()
-                # Refresh dashboard to reflect new budget values
-                self.display_dashboard()
             else:
                 messagebox.showerror("Error", msg)
 
@@ -206,12 +210,18 @@ class UserDashboard:
         return shadow_frame, card_frame
 
     def display_dashboard(self):
-        self.auth_manager.load_users()
+        # The in-memory data is current, only re-read if another process changed the files
+        self.auth_manager.refresh_if_changed()
+        # Computed once per render, every card below reads from it
+        self.summary = self.auth_manager.get_expense_summary()
         self.clear_frame()
         
         # Main container
         main_container = tk.Frame(self.root, bg=self.BG_LIGHT)
         main_container.pack(fill=tk.BOTH, expand=True)
+        self.dashboard_container = main_container
+        self.card_updaters = []
+        self.auth_manager.add_listener(self._on_data_changed)
         
         # Configure grid for main_container: header (row 0), sidebar (row 1, column 0) and content (row 1, column 1)
         main_container.grid_rowconfigure(0, weight=0) # Header will have fixed height
@@ -301,6 +311,25 @@ class UserDashboard:
         
         self._create_fab(main_container)
     
+    def _add_card_updater(self, updater):
+        """Register a card's refresh function and fill the card in straight away."""
+        self.card_updaters.append(updater)
+        updater()
+
+    def _on_data_changed(self):
+        """Update every card in place instead of rebuilding the dashboard."""
+        if self.dashboard_container is None or not self.dashboard_container.winfo_exists():
+            # This dashboard has been replaced by another screen
+            self.auth_manager.remove_listener(self._on_data_changed)
+            return
+        self.summary = self.auth_manager.get_expense_summary()
+        for updater in self.card_updaters:
+            updater()
+
+    def _currency_symbol(self):
+        currency_code = self.auth_manager.get_current_user_data().get('currency', 'INR')
+        return self.CURRENCY_SYMBOLS.get(currency_code, '₹')
+
     def _create_header(self, parent):
         header = tk.Frame(parent, bg=self.PRIMARY_COLOR, height=60)
         header.pack(fill=tk.X)
@@ -378,64 +407,54 @@ class UserDashboard:
         for i in range(4):
             snapshot_frame.grid_columnconfigure(i, weight=1, uniform="snapshot")
         
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-
-        weekly_spent, _, _ = self._calculate_expense_summary(user_expenses, days=7)
-        
-        monthly_spent, _, _ = self._calculate_expense_summary(user_expenses, days=30)
-
-        if user_expenses:
-            total_spent_30_days, _, _ = self._calculate_expense_summary(user_expenses, days=30)
-            avg_daily_spend = total_spent_30_days / 30
-        else:
-            avg_daily_spend = 0.0
-
-        monthly_budget = user_data.get('monthly_budget', 0.0)
-        today = datetime.now()
-        start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        current_month_expenses = sum(expense['amount'] for expense in user_expenses
-                                  if datetime.fromisoformat(expense['timestamp']) >= start_of_month)
-        
-        remaining_budget = monthly_budget - current_month_expenses
-
-        self._create_mini_card(
+        week_value, _ = self._create_mini_card(
             snapshot_frame, 0,
             icon="📅",
             label="This Week",
-            value=f"{currency_symbol}{weekly_spent:,.2f}",
+            value="",
             trend="", 
             trend_color=self.ERROR
         )
         
-        self._create_mini_card(
+        month_value, _ = self._create_mini_card(
             snapshot_frame, 1,
             icon="📆",
             label="This Month",
-            value=f"{currency_symbol}{monthly_spent:,.2f}",
+            value="",
             trend="",
             trend_color=self.SUCCESS
         )
         
-        self._create_mini_card(
+        average_value, _ = self._create_mini_card(
             snapshot_frame, 2,
             icon="📊",
             label="Avg Daily",
-            value=f"{currency_symbol}{avg_daily_spend:,.2f}",
+            value="",
             trend="Last 30 days",
             trend_color=self.TEXT_LIGHT
         )
         
-        self._create_mini_card(
+        remaining_value, remaining_trend = self._create_mini_card(
             snapshot_frame, 3,
             icon="💰",
             label="Remaining Budget",
-            value=f"{currency_symbol}{remaining_budget:,.2f}",
+            value="",
             trend="This Month",
-            trend_color=self.SUCCESS if remaining_budget >= 0 else self.ERROR
+            trend_color=self.SUCCESS
         )
+
+        def update():
+            currency_symbol = self._currency_symbol()
+            monthly_budget = self.auth_manager.get_current_user_data().get('monthly_budget', 0.0)
+            remaining_budget = monthly_budget - self.summary.month_to_date_total
+
+            week_value.config(text=f"{currency_symbol}{self.summary.week_total:,.2f}")
+            month_value.config(text=f"{currency_symbol}{self.summary.month_total:,.2f}")
+            average_value.config(text=f"{currency_symbol}{self.summary.month_total / 30:,.2f}")
+            remaining_value.config(text=f"{currency_symbol}{remaining_budget:,.2f}")
+            remaining_trend.config(fg=self.SUCCESS if remaining_budget >= 0 else self.ERROR)
+
+        self._add_card_updater(update)
     
     def _create_mini_card(self, parent, column, icon, label, value, trend, trend_color):
         shadow_frame, card_frame = self._create_shadow_card(parent)
@@ -457,21 +476,23 @@ class UserDashboard:
             fg=self.TEXT_LIGHT
         ).pack()
         
-        tk.Label(
+        value_label = tk.Label(
             card_frame,
             text=value,
             font=self.FONT_VALUE,
             bg=self.WHITE,
             fg=self.TEXT_DARK
-        ).pack(pady=(4, 4))
+        )
+        value_label.pack(pady=(4, 4))
         
-        tk.Label(
+        trend_label = tk.Label(
             card_frame,
             text=trend,
             font=self.FONT_CAPTION,
             bg=self.WHITE,
             fg=trend_color
-        ).pack()
+        )
+        trend_label.pack()
         
         def on_enter(e):
             shadow_frame.config(bg="#CCCCCC")
@@ -480,6 +501,8 @@ class UserDashboard:
         
         card_frame.bind("<Enter>", on_enter)
         card_frame.bind("<Leave>", on_leave)
+
+        return value_label, trend_label
     
     def _create_total_expense_kpi(self, parent):
         shadow_frame, card_frame = self._create_shadow_card(parent)
@@ -496,23 +519,17 @@ class UserDashboard:
             fg=self.TEXT_DARK
         ).pack(side=tk.LEFT)
         
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-        
-        total_spent_30_days, _, _ = self._calculate_expense_summary(user_expenses, days=30)
-
         value_frame = tk.Frame(card_frame, bg=self.WHITE)
         value_frame.pack(fill=tk.X, pady=(0, 8))
         
-        tk.Label(
+        total_label = tk.Label(
             value_frame,
-            text=f"{currency_symbol}{total_spent_30_days:,.2f}",
+            text="",
             font=self.FONT_KPI,
             bg=self.WHITE,
             fg=self.TEXT_DARK
-        ).pack(side=tk.LEFT)
+        )
+        total_label.pack(side=tk.LEFT)
         
         tk.Label(
             value_frame,
@@ -525,20 +542,24 @@ class UserDashboard:
         chart_frame = tk.Frame(card_frame, bg=self.WHITE)
         chart_frame.pack(fill=tk.BOTH, expand=True)
         
-        fig, ax = plt.subplots(figsize=(6, 2.5), dpi=100, facecolor='white')
-        
-        daily_expenses = { (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d"): 0.0 for i in range(30) }
-        for expense in user_expenses:
-            date_str = expense['date']
-            if date_str in daily_expenses:
-                daily_expenses[date_str] += expense['amount']
-        
-        sorted_dates = sorted(daily_expenses.keys())
-        expenses_data = [daily_expenses[date] for date in sorted_dates]
+        if self.trend_figure is None:
+            self._build_trend_figure()
+        self.trend_canvas = self._attach_figure(self.trend_figure, self.trend_canvas, chart_frame)
+
+        def update():
+            total_label.config(text=f"{self._currency_symbol()}{self.summary.month_total:,.2f}")
+            self._update_trend_figure(self.summary.daily_totals)
+            self.trend_canvas.draw_idle()
+
+        self._add_card_updater(update)
+
+    def _build_trend_figure(self):
+        self.trend_figure = Figure(figsize=(6, 2.5), dpi=100, facecolor='white')
+        ax = self.trend_figure.add_subplot()
         days = list(range(1, 31))
 
-        ax.plot(days, expenses_data, color=self.PRIMARY_COLOR, linewidth=2)
-        ax.fill_between(days, expenses_data, alpha=0.3, color=self.ACCENT_COLOR)
+        self.trend_line, = ax.plot(days, [0.0] * 30, color=self.PRIMARY_COLOR, linewidth=2)
+        self.trend_fill = None
         ax.set_xlabel('Day of Month', fontsize=9, color=self.TEXT_LIGHT)
         ax.set_ylabel('Amount', fontsize=9, color=self.TEXT_LIGHT)
         ax.grid(True, linestyle='--', alpha=0.3, color=self.TEXT_LIGHT)
@@ -546,11 +567,27 @@ class UserDashboard:
         
         ax.spines['top'].set_visible(False)
         
-        plt.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        canvas.draw()
+        self.trend_figure.tight_layout()
+
+    def _update_trend_figure(self, expenses_data):
+        ax = self.trend_figure.axes[0]
+        days = self.trend_line.get_xdata()
+        self.trend_line.set_ydata(expenses_data)
+        if self.trend_fill is not None:
+            self.trend_fill.remove()
+        self.trend_fill = ax.fill_between(days, expenses_data, alpha=0.3, color=self.ACCENT_COLOR)
+        ax.relim()
+        ax.autoscale_view()
+
+    def _attach_figure(self, figure, canvas, master):
+        """Show figure in master, reusing its canvas while the canvas widget still exists."""
+        if canvas is not None and canvas.get_tk_widget().winfo_exists():
+            canvas.draw_idle()
+            return canvas
+        canvas = FigureCanvasTkAgg(figure, master=master)
+        canvas.draw_idle()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        return canvas
     
     def _create_expense_breakdown_pie(self, parent):
         shadow_frame, card_frame = self._create_shadow_card(parent)
@@ -575,70 +612,47 @@ class UserDashboard:
         chart_frame = tk.Frame(content_frame, bg=self.WHITE)
         chart_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
-        # Get dynamic data
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-
-        total_spent_30_days, category_breakdown, _ = self._calculate_expense_summary(user_expenses, days=30)
-
-        if total_spent_30_days == 0:
-            # Handle case with no expenses
-            categories = ["No Expenses"]
-            values = [1]
-            colors = ["#E0E0E0"]
-            total_display_amount = f"{currency_symbol}0.00"
-        else:
-            categories = [cat for cat, amount in category_breakdown]
-            values = [amount for cat, amount in category_breakdown]
-            colors = [self.CATEGORY_COLORS.get(cat, self.CATEGORY_COLORS['Others']) for cat in categories]
-            total_display_amount = f"{currency_symbol}{total_spent_30_days:,.2f}"
-        
-        fig, ax = plt.subplots(figsize=(4, 3.5), dpi=100, facecolor='white')
-        
-        wedges, texts, autotexts = ax.pie(
-            values,
-            labels=None,
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=colors,
-            wedgeprops=dict(width=0.4, edgecolor='white')
-        )
-        
-        # Style the percentage text
-        for autotext in autotexts:
-            autotext.set_color(self.TEXT_DARK) 
-            autotext.set_fontsize(9)
-            autotext.set_weight('bold')
-        
-        # Center circle for donut effect
-        centre_circle = plt.Circle((0, 0), 0.60, fc='white')
-        fig.gca().add_artist(centre_circle)
-        
-        # Total in center
-        ax.text(0, 0, total_display_amount, ha='center', va='center',
-                fontsize=14, weight='bold', color=self.TEXT_DARK)
-        ax.text(0, -0.15, 'Total', ha='center', va='center',
-                fontsize=9, color=self.TEXT_LIGHT)
-        
-        ax.axis('equal')
-        plt.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        if self.pie_figure is None:
+            self.pie_figure = Figure(figsize=(4, 3.5), dpi=100, facecolor='white')
+            self.pie_figure.add_subplot()
         
         # Legend below chart
         legend_frame = tk.Frame(content_frame, bg=self.WHITE)
         legend_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(12, 0)) 
+
+        def update():
+            currency_symbol = self._currency_symbol()
+            total_spent_30_days = self.summary.month_total
+            category_breakdown = self.summary.category_breakdown
+
+            if total_spent_30_days == 0:
+                # Handle case with no expenses
+                categories = ["No Expenses"]
+                values = [1]
+                colors = ["#E0E0E0"]
+                total_display_amount = f"{currency_symbol}0.00"
+            else:
+                categories = [cat for cat, amount in category_breakdown]
+                values = [amount for cat, amount in category_breakdown]
+                colors = [self.CATEGORY_COLORS.get(cat, self.CATEGORY_COLORS['Others']) for cat in categories]
+                total_display_amount = f"{currency_symbol}{total_spent_30_days:,.2f}"
+
+            self._update_pie_figure(values, colors, total_display_amount)
+            self.pie_canvas = self._attach_figure(self.pie_figure, self.pie_canvas, chart_frame)
+            self._fill_pie_legend(legend_frame, categories, colors)
+
+        self._add_card_updater(update)
+
+    def _fill_pie_legend(self, legend_frame, categories, colors):
+        for widget in legend_frame.winfo_children():
+            widget.destroy()
         
         # Arrange items horizontally with wrap-like effect
         row_num = 0
         col_num = 0
         max_cols = 6
         
-        for category, value, color in zip(categories, values, colors):
+        for category, color in zip(categories, colors):
             item_frame = tk.Frame(legend_frame, bg=self.WHITE)
             item_frame.grid(row=row_num, column=col_num, sticky="w", padx=5, pady=3)
             
@@ -661,6 +675,38 @@ class UserDashboard:
             if col_num >= max_cols:
                 col_num = 0
                 row_num += 1
+
+    def _update_pie_figure(self, values, colors, total_display_amount):
+        # The number of wedges follows the categories, so redraw them on the same Axes
+        ax = self.pie_figure.axes[0]
+        ax.clear()
+        wedges, texts, autotexts = ax.pie(
+            values,
+            labels=None,
+            autopct='%1.1f%%',
+            startangle=90,
+            colors=colors,
+            wedgeprops=dict(width=0.4, edgecolor='white')
+        )
+        
+        # Style the percentage text
+        for autotext in autotexts:
+            autotext.set_color(self.TEXT_DARK) 
+            autotext.set_fontsize(9)
+            autotext.set_weight('bold')
+        
+        # Center circle for donut effect
+        centre_circle = Circle((0, 0), 0.60, fc='white')
+        ax.add_artist(centre_circle)
+        
+        # Total in center
+        ax.text(0, 0, total_display_amount, ha='center', va='center',
+                fontsize=14, weight='bold', color=self.TEXT_DARK)
+        ax.text(0, -0.15, 'Total', ha='center', va='center',
+                fontsize=9, color=self.TEXT_LIGHT)
+        
+        ax.axis('equal')
+        self.pie_figure.tight_layout()
     
     def _create_accounts_carousel(self, parent):
         # Header
@@ -692,19 +738,23 @@ class UserDashboard:
         
         canvas.pack(side=tk.TOP, fill=tk.X, expand=True)
         
-        currency_code = self.auth_manager.get_current_user_data().get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-        cash_balance = self.auth_manager.get_current_user_data().get('cash_balance', 0.0)
-        bank_balance = self.auth_manager.get_current_user_data().get('bank_balance', 0.0)
-        credit_card_balance = self.auth_manager.get_current_user_data().get('credit_card_balance', 0.0)
-        
         # Account cards
-        self._create_account_card(scrollable_frame, "Cash", "💵", f"{currency_symbol}{cash_balance:.2f}", 
-                                   "", self.PRIMARY_COLOR, self.SECONDARY_COLOR, vertical_offset=0)
-        self._create_account_card(scrollable_frame, "Bank", "🏦", f"{currency_symbol}{bank_balance:.2f}", 
-                                   "", "#66BB6A", "#4CAF50", vertical_offset=0)
-        self._create_account_card(scrollable_frame, "Credit Card", "💳", f"{currency_symbol}{credit_card_balance:.2f}", 
+        balance_labels = {
+            "cash_balance": self._create_account_card(scrollable_frame, "Cash", "💵", "", 
+                                   "", self.PRIMARY_COLOR, self.SECONDARY_COLOR, vertical_offset=0),
+            "bank_balance": self._create_account_card(scrollable_frame, "Bank", "🏦", "", 
+                                   "", "#66BB6A", "#4CAF50", vertical_offset=0),
+            "credit_card_balance": self._create_account_card(scrollable_frame, "Credit Card", "💳", "", 
                                    "", "#FFA726", "#FF9800", vertical_offset=6)
+        }
+
+        def update():
+            currency_symbol = self._currency_symbol()
+            user_data = self.auth_manager.get_current_user_data()
+            for field, label in balance_labels.items():
+                label.config(text=f"{currency_symbol}{user_data.get(field, 0.0):.2f}")
+
+        self._add_card_updater(update)
         
         # Add Account button
         add_btn_frame = tk.Frame(scrollable_frame, bg=self.BG_LIGHT, 
@@ -771,13 +821,14 @@ class UserDashboard:
             fg=self.WHITE
         ).pack(side=tk.LEFT, anchor="center", padx=(5,0), pady=(vertical_offset,0))
         
-        tk.Label(
+        balance_label = tk.Label(
             content_frame,
             text=balance,
             font=self.FONT_BODY,
             bg=color1,
             fg=self.WHITE
-        ).grid(row=1, column=0, sticky="w")
+        )
+        balance_label.grid(row=1, column=0, sticky="w")
         
         tk.Label(
             content_frame,
@@ -806,6 +857,8 @@ class UserDashboard:
         card_frame.bind("<Leave>", on_leave)
         content_frame.bind("<Enter>", on_enter)
         content_frame.bind("<Leave>", on_leave)
+
+        return balance_label
     
     def _create_budget_progress(self, parent):
         shadow_frame, card_frame = self._create_shadow_card(parent)
@@ -840,44 +893,19 @@ class UserDashboard:
             outline="#E0E0E0", width=width
         )
         
-        # Progress arc
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-        monthly_budget = user_data.get('monthly_budget', 0.0)
-        
-        # Calculate spent amount for the current month
-        today = datetime.now()
-        start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        spent_amount = sum(expense['amount'] for expense in user_expenses
-                           if datetime.fromisoformat(expense['timestamp']) >= start_of_month and
-                           datetime.fromisoformat(expense['timestamp']) <= today)
-
-        percentage = min(100, (spent_amount / monthly_budget) * 100) if monthly_budget > 0 else 0
-        
-        # Determine color based on percentage
-        if percentage <= 80:
-            progress_color = self.SUCCESS
-        elif percentage <= 100:
-            progress_color = "#F39C12" 
-        else:
-            progress_color = self.ERROR
-        
-        extent = (percentage / 100) * 360
-        canvas_widget.create_arc(
+        # Progress arc, filled in by update()
+        progress_arc = canvas_widget.create_arc(
             center - radius, center - radius,
             center + radius, center + radius,
-            start=90, extent=-extent,
-            outline=progress_color, width=width,
+            start=90, extent=0,
+            outline=self.SUCCESS, width=width,
             style=tk.ARC
         )
         
         # Center text
-        canvas_widget.create_text(
+        percentage_text = canvas_widget.create_text(
             center, center - 10,
-            text=f"{int(percentage)}%",
+            text="0%",
             font=self.FONT_KPI,
             fill=self.TEXT_DARK
         )
@@ -905,13 +933,14 @@ class UserDashboard:
             fg=self.TEXT_LIGHT
         ).pack(side=tk.LEFT)
         
-        tk.Label(
+        spent_label = tk.Label(
             spent_frame,
-            text=f"{currency_symbol}{spent_amount:,.2f}",
+            text="",
             font=self.FONT_VALUE,
             bg=self.WHITE,
             fg=self.TEXT_DARK
-        ).pack(side=tk.RIGHT)
+        )
+        spent_label.pack(side=tk.RIGHT)
         
         # Total
         total_frame = tk.Frame(details_frame, bg=self.WHITE)
@@ -925,16 +954,16 @@ class UserDashboard:
             fg=self.TEXT_LIGHT
         ).pack(side=tk.LEFT)
         
-        tk.Label(
+        budget_label = tk.Label(
             total_frame,
-            text=f"{currency_symbol}{monthly_budget:,.2f}",
+            text="",
             font=self.FONT_BODY,
             bg=self.WHITE,
             fg=self.TEXT_DARK
-        ).pack(side=tk.RIGHT)
+        )
+        budget_label.pack(side=tk.RIGHT)
         
         # Remaining
-        remaining = monthly_budget - spent_amount
         remaining_frame = tk.Frame(details_frame, bg=self.WHITE)
         remaining_frame.pack(fill=tk.X, pady=2)
         
@@ -946,32 +975,54 @@ class UserDashboard:
             fg=self.TEXT_LIGHT
         ).pack(side=tk.LEFT)
         
-        tk.Label(
+        remaining_label = tk.Label(
             remaining_frame,
-            text=f"{currency_symbol}{remaining:,.2f}",
+            text="",
             font=self.FONT_VALUE,
-            bg=self.WHITE,
-            fg=self.SUCCESS if remaining >= 0 else self.ERROR
-        ).pack(side=tk.RIGHT)
-        
-        # Status indicator
-        if percentage <= 80:
-            status_text = "✅ On Track"
-            status_color = self.SUCCESS
-        elif percentage <= 100:
-            status_text = "⚠️ Almost There"
-            status_color = "#F39C12"
-        else:
-            status_text = "🚨 Over Budget"
-            status_color = self.ERROR
+            bg=self.WHITE
+        )
+        remaining_label.pack(side=tk.RIGHT)
         
-        tk.Label(
+        status_label = tk.Label(
             card_frame,
-            text=status_text,
+            text="",
             font=self.FONT_SUBHEADER,
-            bg=self.WHITE,
-            fg=status_color
-        ).pack(pady=(8, 0))
+            bg=self.WHITE
+        )
+        status_label.pack(pady=(8, 0))
+
+        def update():
+            currency_symbol = self._currency_symbol()
+            monthly_budget = self.auth_manager.get_current_user_data().get('monthly_budget', 0.0)
+            spent_amount = self.summary.month_to_date_total
+
+            percentage = min(100, (spent_amount / monthly_budget) * 100) if monthly_budget > 0 else 0
+            
+            # Determine color and status based on percentage
+            if percentage <= 80:
+                progress_color = self.SUCCESS
+                status_text = "✅ On Track"
+            elif percentage <= 100:
+                progress_color = "#F39C12" 
+                status_text = "⚠️ Almost There"
+            else:
+                progress_color = self.ERROR
+                status_text = "🚨 Over Budget"
+            
+            extent = (percentage / 100) * 360
+            canvas_widget.itemconfigure(progress_arc, extent=-extent, outline=progress_color)
+            canvas_widget.itemconfigure(percentage_text, text=f"{int(percentage)}%")
+
+            remaining = monthly_budget - spent_amount
+            spent_label.config(text=f"{currency_symbol}{spent_amount:,.2f}")
+            budget_label.config(text=f"{currency_symbol}{monthly_budget:,.2f}")
+            remaining_label.config(
+                text=f"{currency_symbol}{remaining:,.2f}",
+                fg=self.SUCCESS if remaining >= 0 else self.ERROR
+            )
+            status_label.config(text=status_text, fg=progress_color)
+
+        self._add_card_updater(update)
     
     def _create_recent_transactions(self, parent):
         shadow_frame, card_frame = self._create_shadow_card(parent)
@@ -1028,6 +1079,7 @@ class UserDashboard:
         
         self.search_entry.bind("<FocusIn>", on_focus_in)
         self.search_entry.bind("<FocusOut>", on_focus_out)
+        self.search_entry.bind("<KeyRelease>", self._filter_treeview)
         self.search_entry.config(fg=self.TEXT_LIGHT)
         
         # Table
@@ -1059,35 +1111,14 @@ class UserDashboard:
         )
         
         for col in columns:
-            self.transactions_tree.heading(col, text=col, anchor=tk.W)
+            self.transactions_tree.heading(col, text=col, anchor=tk.W,
+                                           command=lambda c=col: self._sort_treeview(self.transactions_tree, c, False))
             if col == "Amount":
                 self.transactions_tree.column(col, anchor=tk.E, width=100)
             else:
                 self.transactions_tree.column(col, anchor=tk.W, width=120)
         
-        # Get dynamic data
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-
-        _, _, recent_transactions = self._calculate_expense_summary(user_expenses, days=365) # Get all recent for table
-
-        # Clear existing items
-        for item in self.transactions_tree.get_children():
-            self.transactions_tree.delete(item)
-
-        if not recent_transactions:
-            self.transactions_tree.insert("", "end", values=("", "No transactions yet", ""))
-        else:
-            for expense in recent_transactions:
-                display_date = datetime.fromisoformat(expense['date']).strftime("%b %d")
-                category = expense['category'].capitalize()
-                amount = expense['amount']
-                # Determine if it's an expense or income (for now, all are expenses)
-                amount_text = f"-{currency_symbol}{amount:,.2f}"
-                tag = category.lower() # Use lower case for tags
-                self.transactions_tree.insert("", "end", values=(display_date, f"● {category}", amount_text), tags=(tag,))
+        self._add_card_updater(self._fill_recent_transactions)
         
         # Configure tags for color-coding
         for category_name, color_hex in self.CATEGORY_COLORS.items():
@@ -1106,7 +1137,35 @@ class UserDashboard:
             cursor="hand2"
         )
         view_all.pack(pady=(8, 0))
-        view_all.bind("<Button-1>", lambda e: display_all_transactions_screen(self.root, self.auth_manager, self))
+        view_all.bind("<Button-1>", lambda e: self.show_all_transactions_screen())
+    
+    def _fill_recent_transactions(self):
+        # Search results searched the whole history, keep showing them until the search box is cleared
+        results = self._search_results()
+        if results is None:
+            self.transaction_sorter.set_rows(self.summary.recent_transactions)
+            self._show_transactions(self.transaction_sorter.rows)
+        else:
+            self.transaction_sorter.set_rows(results)
+            self._show_transactions(self.transaction_sorter.rows, "No matching transactions")
+
+    def _show_transactions(self, transactions, empty_text="No transactions yet"):
+        currency_symbol = self._currency_symbol()
+
+        # Clear existing items
+        self.transactions_tree.delete(*self.transactions_tree.get_children())
+
+        if not transactions:
+            self.transactions_tree.insert("", "end", values=("", empty_text, ""))
+        else:
+            for expense in transactions:
+                display_date = expense.date.strftime("%b %d")
+                category = expense.category.capitalize()
+                amount = expense.amount
+                # Determine if it's an expense or income (for now, all are expenses)
+                amount_text = f"-{currency_symbol}{amount:,.2f}"
+                tag = category.lower() # Use lower case for tags
+                self.transactions_tree.insert("", "end", values=(display_date, f"● {category}", amount_text), tags=(tag,))
     
     def _create_top_categories(self, parent):
         """Create the top 3 expense categories widget"""
@@ -1122,84 +1181,92 @@ class UserDashboard:
             fg=self.TEXT_DARK
         ).pack(anchor="w", pady=(0, 12))
         
-        # Get dynamic data
-        user_data = self.auth_manager.get_current_user_data()
-        user_expenses = user_data.get('expenses', [])
-        currency_code = user_data.get('currency', 'INR')
-        currency_symbol = self.CURRENCY_SYMBOLS.get(currency_code, '₹')
-
-        total_spent_this_month, category_breakdown, _ = self._calculate_expense_summary(user_expenses, days=30)
-
-        top_categories_data = []
-        if total_spent_this_month > 0:
-            # Get top 3 categories by amount spent this month
-            sorted_categories = category_breakdown # Already sorted from _calculate_expense_summary
-            for i, (category, amount) in enumerate(sorted_categories[:3]):
-                percentage = (amount / total_spent_this_month) * 100
-                rank_icon = ["🥇", "🥈", "🥉"][i]
-                color = self.CATEGORY_COLORS.get(category, self.CATEGORY_COLORS['Others'])
-                top_categories_data.append((rank_icon, f"● {category}", f"{currency_symbol}{amount:,.2f}", percentage, color))
-        
-        if not top_categories_data:
-            tk.Label(
-                card_frame,
-                text="No expenses recorded this month.",
-                font=self.FONT_BODY,
-                bg=self.WHITE,
-                fg=self.TEXT_LIGHT
-            ).pack(anchor="w", pady=10)
-        else:
-            for rank, category, amount, percentage, color in top_categories_data:
-                item_frame = tk.Frame(card_frame, bg=self.WHITE)
-                item_frame.pack(fill=tk.X, pady=8)
-                
-                # Rank badge
+        # Rows are rebuilt by update(), the header above stays
+        rows_frame = tk.Frame(card_frame, bg=self.WHITE)
+        rows_frame.pack(fill=tk.X)
+
+        def update():
+            for widget in rows_frame.winfo_children():
+                widget.destroy()
+
+            currency_symbol = self._currency_symbol()
+
+            total_spent_this_month = self.summary.month_total
+            category_breakdown = self.summary.category_breakdown
+
+            top_categories_data = []
+            if total_spent_this_month > 0:
+                # Get top 3 categories by amount spent this month
+                sorted_categories = category_breakdown # Already sorted by the summary
+                for i, (category, amount) in enumerate(sorted_categories[:3]):
+                    percentage = (amount / total_spent_this_month) * 100
+                    rank_icon = ["🥇", "🥈", "🥉"][i]
+                    color = self.CATEGORY_COLORS.get(category, self.CATEGORY_COLORS['Others'])
+                    top_categories_data.append((rank_icon, f"● {category}", f"{currency_symbol}{amount:,.2f}", percentage, color))
+        
+            if not top_categories_data:
                 tk.Label(
-                    item_frame,
-                    text=rank,
-                    font=self.FONT_XXL,
-                    bg=self.WHITE
-                ).pack(side=tk.LEFT, padx=(0, 12))
+                    rows_frame,
+                    text="No expenses recorded this month.",
+                    font=self.FONT_BODY,
+                    bg=self.WHITE,
+                    fg=self.TEXT_LIGHT
+                ).pack(anchor="w", pady=10)
+            else:
+                for rank, category, amount, percentage, color in top_categories_data:
+                    item_frame = tk.Frame(rows_frame, bg=self.WHITE)
+                    item_frame.pack(fill=tk.X, pady=8)
                 
-                # Category details
-                details_frame = tk.Frame(item_frame, bg=self.WHITE)
-                details_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+                    # Rank badge
+                    tk.Label(
+                        item_frame,
+                        text=rank,
+                        font=self.FONT_XXL,
+                        bg=self.WHITE
+                    ).pack(side=tk.LEFT, padx=(0, 12))
                 
-                # Category name
-                tk.Label(
-                    details_frame,
-                    text=category,
-                    font=self.FONT_SUBHEADER,
-                    bg=self.WHITE,
-                    fg=self.TEXT_DARK
-                ).pack(anchor="w")
+                    # Category details
+                    details_frame = tk.Frame(item_frame, bg=self.WHITE)
+                    details_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
                 
-                # Amount and percentage
-                info_frame = tk.Frame(details_frame, bg=self.WHITE)
-                info_frame.pack(fill=tk.X, pady=(2, 4))
+                    # Category name
+                    tk.Label(
+                        details_frame,
+                        text=category,
+                        font=self.FONT_SUBHEADER,
+                        bg=self.WHITE,
+                        fg=self.TEXT_DARK
+                    ).pack(anchor="w")
                 
-                tk.Label(
-                    info_frame,
-                    text=amount,
-                    font=self.FONT_VALUE,
-                    bg=self.WHITE,
-                    fg=self.TEXT_DARK
-                ).pack(side=tk.LEFT)
+                    # Amount and percentage
+                    info_frame = tk.Frame(details_frame, bg=self.WHITE)
+                    info_frame.pack(fill=tk.X, pady=(2, 4))
                 
-                tk.Label(
-                    info_frame,
-                    text=f"{percentage:.1f}% of total",
-                    font=self.FONT_CAPTION,
-                    bg=self.WHITE,
-                    fg=self.TEXT_LIGHT
-                ).pack(side=tk.LEFT, padx=8)
+                    tk.Label(
+                        info_frame,
+                        text=amount,
+                        font=self.FONT_VALUE,
+                        bg=self.WHITE,
+                        fg=self.TEXT_DARK
+                    ).pack(side=tk.LEFT)
+                
+                    tk.Label(
+                        info_frame,
+                        text=f"{percentage:.1f}% of total",
+                        font=self.FONT_CAPTION,
+                        bg=self.WHITE,
+                        fg=self.TEXT_LIGHT
+                    ).pack(side=tk.LEFT, padx=8)
                 
-                # Progress bar
-                progress_bg = tk.Frame(details_frame, bg="#E0E0E0", height=4)
-                progress_bg.pack(fill=tk.X)
+                    # Progress bar
+                    progress_bg = tk.Frame(details_frame, bg="#E0E0E0", height=4)
+                    progress_bg.pack(fill=tk.X)
                 
-                progress_fill = tk.Frame(progress_bg, bg=color, height=4)
-                progress_fill.place(relwidth=percentage/100, relheight=1.0)
+                    progress_fill = tk.Frame(progress_bg, bg=color, height=4)
+                    progress_fill.place(relwidth=percentage/100, relheight=1.0)
+    
+
+        self._add_card_updater(update)
     
     def _create_fab(self, parent):
         # Container for FAB and sub-buttons
@@ -1411,13 +1478,13 @@ class UserDashboard:
                 # Return to home dashboard
                 item_frame.bind("<Button-1>", lambda e: self.display_dashboard())
             elif text == "Records":
-                item_frame.bind("<Button-1>", lambda e: records_screen.display_records_screen(self.root, self.auth_manager, self))
+                item_frame.bind("<Button-1>", lambda e: self.show_records_screen())
             elif text == "Budgets":
                 # Open the budget setup window (same as onboarding)
                 item_frame.bind("<Button-1>", lambda e: self.show_budget_window())
             elif text == "Summary":
                 # Open the AI Summary screen
-                item_frame.bind("<Button-1>", lambda e: display_summary_screen(self.root, self.auth_manager, self))
+                item_frame.bind("<Button-1>", lambda e: self.show_summary_screen())
             else:
                 # Only bind Button-1 for non-toggle items
                 if text not in ["Dark mode", "Hide Amounts"]:
@@ -1445,36 +1512,29 @@ class UserDashboard:
         pass
     
     def _sort_treeview(self, tree, col, reverse):
-  
-        l = [(tree.set(k, col), k) for k in tree.get_children('')]
-        # Convert amount to float for proper sorting if it's the amount column
-        if col == "Amount":
-            try:
-                l.sort(key=lambda t: float(t[0].replace('₹', '').replace(',', '').replace('+', '').replace('-', '')), reverse=reverse)
-            except:
-                l.sort(reverse=reverse)
+        # Sort the records behind the rows, not the rendered text, then redraw once
+        self._show_transactions(self.transaction_sorter.sorted_rows(col, reverse))
 
-        # rearrange items in sorted order
-        for index, (val, k) in enumerate(l):
-            tree.move(k, '', index)
-        
         # reverse sort next time
         tree.heading(col, command=lambda: self._sort_treeview(tree, col, not reverse))
     
     def _filter_treeview(self, event):
-        """Filter treeview based on search term"""
-        if not hasattr(self, 'transactions_tree'):
+        """Search the whole history once typing pauses"""
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self.search_job = None
+        if not self.search_entry.winfo_exists():
             return
-            
-        search_term = event.widget.get().lower()
-        if search_term == "search transactions...":
-            return
-            
-        for item_id in self.transactions_tree.get_children():
-            item_values = [str(self.transactions_tree.item(item_id, "values")[col_idx]).lower() 
-                          for col_idx in range(len(self.transactions_tree["columns"]))]
-            
-            if any(search_term in value for value in item_values):
-                self.transactions_tree.reattach(item_id, '', tk.END)
-            else:
-                self.transactions_tree.detach(item_id)
+        self._fill_recent_transactions()
+
+    def _search_results(self):
+        """Expenses matching the search box, None when it holds no search"""
+        if not hasattr(self, 'search_entry') or not self.search_entry.winfo_exists():
+            return None
+        query = self.search_entry.get()
+        if query == "Search transactions...":
+            return None
+        return self.auth_manager.search_expenses(query, limit=SEARCH_RESULT_LIMIT)
@@ -0,0 +1,82 @@
+import tkinter as tk
+
+
+class VirtualList:
+    """Scrollable list that only keeps widgets for the rows in view.
+
+    The model lays rows out: model.height() is the full height in pixels and
+    model.rows_between(top, bottom) yields (key, kind, y, height, payload) for
+    each row overlapping that band. factories[kind](parent) builds one row
+    widget and returns (widget, fill), where fill(payload) shows a row in it.
+    Widgets that scroll out of view are hidden and reused for the next row of
+    the same kind, so the widget count follows the viewport, not the model.
+    """
+
+    def __init__(self, parent, factories, bg=None, buffer=200):
+        self.factories = factories
+        self.buffer = buffer
+        self.model = None
+        self.visible = {}
+        self.free = {kind: [] for kind in factories}
+
+        self.canvas = tk.Canvas(parent, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.bind("<Configure>", self._on_resize)
+
+    def pack(self):
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def set_model(self, model):
+        """Show a new model from the top, recycling every row widget currently shown."""
+        for key in list(self.visible):
+            self._release(key)
+        self.model = model
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), model.height()))
+        self.canvas.yview_moveto(0)
+        self.render()
+
+    def render(self):
+        if self.model is None:
+            return
+        top = self.canvas.canvasy(0) - self.buffer
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + self.buffer
+        wanted = {}
+        for key, kind, y, height, payload in self.model.rows_between(top, bottom):
+            wanted[key] = (kind, y, height, payload)
+
+        for key in list(self.visible):
+            if key not in wanted:
+                self._release(key)
+
+        width = self.canvas.winfo_width()
+        for key, (kind, y, height, payload) in wanted.items():
+            if key not in self.visible:
+                window, fill = self._acquire(kind)
+                fill(payload)
+                self.visible[key] = (kind, window, fill)
+            window = self.visible[key][1]
+            self.canvas.coords(window, 0, y)
+            self.canvas.itemconfigure(window, width=width, height=height, state="normal")
+
+    def _acquire(self, kind):
+        if self.free[kind]:
+            return self.free[kind].pop()
+        widget, fill = self.factories[kind](self.canvas)
+        window = self.canvas.create_window(0, 0, window=widget, anchor="nw")
+        return window, fill
+
+    def _release(self, key):
+        kind, window, fill = self.visible.pop(key)
+        self.canvas.itemconfigure(window, state="hidden")
+        self.free[kind].append((window, fill))
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.render()
+
+    def _on_resize(self, event):
+        if self.model is not None:
+            self.canvas.configure(scrollregion=(0, 0, event.width, self.model.height()))
+        self.render()